@@ -0,0 +1,78 @@
+"""
+Import-time budget check for main.py.
+
+Runs `python -X importtime -c "import main"` several times in fresh
+interpreters, takes the best cumulative time of the `main` import and
+fails (exit code 1) if it is over budget or if importing main pulled in
+the network stack.
+
+Usage:
+    python benchmarks/bench_import_time.py [--budget-ms 60] [--runs 5]
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Must not be loaded by `import main` (offline / analysis-only runs)
+FORBIDDEN_MODULES = ["requests", "urllib3", "http.client", "ssl", "multiprocessing", "sqlite3"]
+
+
+def measure_import_ms(module: str = "main") -> float:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    # lines look like: "import time:   self [us] | cumulative | name"
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1].strip()) / 1000
+    raise RuntimeError(f"no importtime entry for {module}")
+
+
+def loaded_forbidden_modules(module: str = "main") -> list[str]:
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {FORBIDDEN_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    out = proc.stdout.strip()
+    return out.split(",") if out else []
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=60.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = [measure_import_ms() for _ in range(args.runs)]
+    best = min(timings)
+    print(f"import main: best {best:.1f}ms over {args.runs} runs "
+          f"(all: {', '.join(f'{t:.1f}' for t in timings)}) | budget {args.budget_ms:.1f}ms")
+
+    failed = False
+    if best > args.budget_ms:
+        print(f"FAIL: import time {best:.1f}ms exceeds budget {args.budget_ms:.1f}ms")
+        failed = True
+
+    leaked = loaded_forbidden_modules()
+    if leaked:
+        print(f"FAIL: `import main` loaded {', '.join(leaked)}")
+        failed = True
+
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
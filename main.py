@@ -1,21 +1,45 @@
-from utils.file_handler import load_sales_data, validate_and_filter
-from utils.api_handler import (
-    fetch_all_products,
-    fetch_products_101_to_200,
-    create_product_mapping,
-    enrich_sales_data,
-    save_enriched_data,
-)
+import argparse
+from functools import partial
+
+from utils.checkpoint import MISSING, CheckpointStore, input_digest
+from utils.file_handler import list_sources, load_sales_data, validate_and_filter
+from utils.pipeline import Pipeline
 from utils.data_processor import (
     calculate_total_revenue,
     region_wise_sales,
     top_selling_products,
-    customer_analysis,
+    top_customers,
     daily_sales_trend,
     find_peak_sales_day,
     low_performing_products,
+    rfm_segmentation,
 )
-from utils.report_generator import generate_sales_report
+from utils.report_generator import generate_sales_report, generate_rfm_report, generate_basket_report
+
+
+# Products bought by fewer than 5% of customers are left out of pair rules
+BASKET_MIN_SUPPORT = 0.05
+
+# Analysis moves to a worker process above this many records
+PROCESS_ANALYSIS_MIN_ROWS = 200_000
+
+
+def _run_analysis(valid_records, max_keys=None):
+    """
+    [5/10] Part 2 analytics (module-level so it can run in a process pool).
+    max_keys routes the per-customer/per-date aggregations (and RFM) out of core.
+    """
+    daily_trend = daily_sales_trend(valid_records, max_keys=max_keys)
+    return {
+        "total_revenue": calculate_total_revenue(valid_records),
+        "region_stats": region_wise_sales(valid_records),
+        "top_products": top_selling_products(valid_records, n=5),
+        "top_customers": top_customers(valid_records, n=5, max_keys=max_keys),
+        "daily_trend": daily_trend,
+        "peak_day": find_peak_sales_day(valid_records, trend=daily_trend),
+        "low_products": low_performing_products(valid_records, threshold=10),
+        "rfm": rfm_segmentation(valid_records, max_keys=max_keys),
+    }
 
 
 def _banner() -> None:
@@ -25,17 +49,69 @@ def _banner() -> None:
     print("")
 
 
-def main() -> None:
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sales Analytics System")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="never touch the network; enrich from data/products_cache.json if present",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="discard stage checkpoints from a previous failed run and start over",
+    )
+    parser.add_argument(
+        "--memory-budget-keys",
+        type=int,
+        default=None,
+        metavar="N",
+        help=(
+            "aggregate customers, dates and RFM out of core, holding at most N groups "
+            "in memory; the loaded records themselves (and their checkpoints) and the "
+            "basket analysis still stay in memory"
+        ),
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
     """
     Main execution function (Task 5.1)
     """
+    args = _parse_args(argv)
     try:
+        # Imported lazily; `requests` itself is only loaded if a fetch happens
+        from utils.api_handler import (
+            fetch_all_products,
+            fetch_products_101_to_200,
+            create_product_mapping,
+            enrich_sales_data,
+            save_enriched_data,
+            save_product_cache,
+            load_product_cache,
+        )
+
         _banner()
 
+        # Stage checkpoints (parsed/validated/analyzed/enriched), keyed by a
+        # hash of the input file(s); a rerun after a failure resumes from the
+        # last completed stage. Cleared once the run completes, or up front
+        # with --fresh (this run is then still checkpointed).
+        file_path = r"data\sales_data.txt"
+        checkpoints = CheckpointStore(input_digest(list_sources(file_path)), root=".checkpoints")
+        if args.fresh:
+            checkpoints.clear()
+
         # [1/10] Reading sales data
         print("[1/10] Reading sales data...")
-        file_path = r"data\sales_data.txt"
-        transactions, total_parsed, invalid_removed_parse = load_sales_data(file_path)
+        parsed = checkpoints.load("parsed", {})
+        if parsed is MISSING:
+            parsed = load_sales_data(file_path)
+            checkpoints.save("parsed", {}, parsed)
+        else:
+            print("  (resumed from checkpoint)")
+        transactions, total_parsed, invalid_removed_parse = parsed
         print(f"✓ Successfully read {total_parsed} transactions")
         if invalid_removed_parse:
             print(f"  (Removed during parsing: {invalid_removed_parse})")
@@ -52,7 +128,8 @@ def main() -> None:
 
         # Use validate_and_filter once to compute available regions/range prints,
         # but do not filter yet. This prints regions + amount range as required.
-        _tmp_valid, _tmp_invalid, _tmp_summary = validate_and_filter(transactions)
+        # (Anomaly scoring happens in the real pass at [4/10].)
+        _tmp_valid, _tmp_invalid, _tmp_summary = validate_and_filter(transactions, detect_anomalies=False)
 
         # Ask user if they want filtering
         choice = input("\nDo you want to filter data? (y/n): ").strip().lower()
@@ -75,75 +152,174 @@ def main() -> None:
 
         print("")
 
+        filters = {"region": region, "min_amount": min_amount, "max_amount": max_amount}
+
         # [4/10] Validating transactions (and applying optional filters)
         print("[4/10] Validating transactions...")
-        valid_records, invalid_count, summary = validate_and_filter(
-            transactions,
-            region=region,
-            min_amount=min_amount,
-            max_amount=max_amount,
-        )
+        validated = checkpoints.load("validated", filters)
+        if validated is MISSING:
+            validated = validate_and_filter(
+                transactions,
+                region=region,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                anomaly_file=r"output\anomalies.txt",
+            )
+            checkpoints.save("validated", filters, validated)
+        else:
+            print("  (resumed from checkpoint)")
+        valid_records, invalid_count, summary = validated
         print(f"✓ Valid: {len(valid_records)} | Invalid: {invalid_count}")
+        if summary["anomalies"]:
+            print(f"  (Flagged as anomalies: {summary['anomalies']} -> output\\anomalies.txt)")
         print("")
 
-        # [5/10] Analyzing sales data (Part 2)
-        print("[5/10] Analyzing sales data...")
-        total_revenue = calculate_total_revenue(valid_records)
-        region_stats = region_wise_sales(valid_records)
-        top_products = top_selling_products(valid_records, n=5)
-        cust_stats = customer_analysis(valid_records)
-        daily_trend = daily_sales_trend(valid_records)
-        peak_day = find_peak_sales_day(valid_records)
-        low_products = low_performing_products(valid_records, threshold=10)
-        print("✓ Analysis complete")
-        print("")
+        # [5/10]-[9/10] run as a DAG: analysis overlaps the API fetch,
+        # and the two enrichment outputs are built and saved independently.
+        #
+        #   valid_records -> analyze -> rfm_report
+        #                          \------------------------------------+
+        #   fetch_100 -> enrich_100 -> save_enriched_100                |
+        #   fetch_101_200 -> enrich_101_200 -> save_enriched_101_200    |
+        #                                 \-> report <-----------------+
+        pipeline = Pipeline(max_workers=4)
+        artifacts = {"valid_records": valid_records}
 
-        # [6/10] Fetching product data from API (Task 3.1a)
-        print("[6/10] Fetching product data from API...")
-        api_products_100 = fetch_all_products()  # limit=100 (required)
-        print(f"✓ Fetched {len(api_products_100)} products (limit=100)")
-        print("")
+        analysis = checkpoints.load("analyzed", filters)
+        if analysis is MISSING:
+            # Big inputs go to a worker process so analysis doesn't hold
+            # the GIL while the fetch threads are running
+            executor = "process" if len(valid_records) > PROCESS_ANALYSIS_MIN_ROWS else "thread"
+            pipeline.add(
+                "analyze", partial(_run_analysis, max_keys=args.memory_budget_keys),
+                ["valid_records"], ["analysis"], executor=executor,
+            )
+        else:
+            print("[5/10] Analysis resumed from checkpoint")
+            artifacts["analysis"] = analysis
 
-        # [7/10] Enriching sales data (two outputs)
-        print("[7/10] Enriching sales data...")
+        enrich_params = {**filters, "offline": args.offline}
+        enriched = checkpoints.load("enriched", enrich_params)
+        product_cache_file = r"data\products_cache.json"
 
-        mapping_100 = create_product_mapping(api_products_100)
-        enriched_100 = enrich_sales_data(valid_records, mapping_100)
+        if enriched is not MISSING:
+            print("[6/10] API fetch skipped: enrichment resumed from checkpoint")
+            artifacts["enriched_100"], artifacts["enriched_101_200"] = enriched
+        else:
+            if args.offline:
+                def load_cached():
+                    cached = load_product_cache(product_cache_file)
+                    return cached.get("limit_100", []), cached.get("101_200", [])
 
-        # Supplemental 101-200 to allow matching sales ProductIDs P101–P110
-        api_products_101_200 = fetch_products_101_to_200()
-        mapping_101_200 = create_product_mapping(api_products_101_200)
-        enriched_101_200 = enrich_sales_data(valid_records, mapping_101_200)
+                # local disk read: run inline on the scheduler thread
+                pipeline.add("load_product_cache", load_cached, [],
+                             ["api_products_100", "api_products_101_200"], executor="main")
+            else:
+                pipeline.add("fetch_100", fetch_all_products, [], ["api_products_100"])  # limit=100 (required)
+                # Supplemental 101-200 to allow matching sales ProductIDs P101–P110
+                pipeline.add("fetch_101_200", fetch_products_101_to_200, [], ["api_products_101_200"])
+                pipeline.add(
+                    "save_product_cache",
+                    lambda p100, p101: save_product_cache(
+                        {"limit_100": p100, "101_200": p101}, product_cache_file
+                    ),
+                    ["api_products_100", "api_products_101_200"],
+                )
 
-        enriched_success = sum(1 for t in enriched_101_200 if t.get("API_Match") is True)
-        success_rate = (enriched_success / len(enriched_101_200) * 100) if enriched_101_200 else 0.0
-        print(f"✓ Enriched {enriched_success}/{len(enriched_101_200)} transactions ({success_rate:.1f}%)")
-        print("")
+            pipeline.add(
+                "enrich_100",
+                lambda recs, products: enrich_sales_data(recs, create_product_mapping(products)),
+                ["valid_records", "api_products_100"],
+                ["enriched_100"],
+            )
+            pipeline.add(
+                "enrich_101_200",
+                lambda recs, products: enrich_sales_data(recs, create_product_mapping(products)),
+                ["valid_records", "api_products_101_200"],
+                ["enriched_101_200"],
+            )
 
-        # [8/10] Saving enriched data
-        print("[8/10] Saving enriched data...")
-        save_enriched_data(
-            enriched_100,
-            filename=r"data\enriched_sales_data_limit_100.txt",
-            comment="Task 3.1a output: limit=100 (IDs 1–100). Sales ProductIDs P101–P110 likely won't match."
+        pipeline.add(
+            "save_enriched_100",
+            lambda rows: save_enriched_data(
+                rows,
+                filename=r"data\enriched_sales_data_limit_100.txt",
+                comment="Task 3.1a output: limit=100 (IDs 1–100). Sales ProductIDs P101–P110 likely won't match."
+            ),
+            ["enriched_100"],
         )
-        save_enriched_data(
-            enriched_101_200,
-            filename=r"data\enriched_sales_data_101_200.txt",
-            comment="Supplemental enrichment output using IDs 101–200 for sales ProductIDs."
+        pipeline.add(
+            "save_enriched_101_200",
+            lambda rows: save_enriched_data(
+                rows,
+                filename=r"data\enriched_sales_data_101_200.txt",
+                comment="Supplemental enrichment output using IDs 101–200 for sales ProductIDs."
+            ),
+            ["enriched_101_200"],
         )
-        print("✓ Saved to: data\\enriched_sales_data_limit_100.txt")
-        print("✓ Saved to: data\\enriched_sales_data_101_200.txt")
-        print("")
 
-        # [9/10] Generating comprehensive report (Task 4.1)
-        print("[9/10] Generating report...")
-        generate_sales_report(
-            valid_records,
-            enriched_101_200,
-            output_file=r"output\sales_report.txt",
+        def report(recs, enriched_rows, analysis_results):
+            # [9/10] Generating comprehensive report (Task 4.1) from the
+            # metrics the analyze stage already computed
+            generate_sales_report(recs, enriched_rows, output_file=r"output\sales_report.txt",
+                                  analysis=analysis_results)
+
+        pipeline.add("report", report, ["valid_records", "enriched_101_200", "analysis"])
+        # Needs no API data, so it is written as soon as the analysis is done
+        pipeline.add(
+            "rfm_report",
+            lambda analysis_results: generate_rfm_report(
+                analysis_results["rfm"], output_file=r"output\rfm_segments.txt"
+            ),
+            ["analysis"],
         )
-        print("✓ Report saved to: output\\sales_report.txt")
+
+        def basket(recs):
+            from utils.basket_analysis import association_rules
+            rules = association_rules(recs, min_support=BASKET_MIN_SUPPORT)
+            generate_basket_report(rules, output_file=r"output\product_affinity.txt")
+
+        pipeline.add("basket", basket, ["valid_records"])
+
+        enriched_outputs = {}
+
+        def on_complete(stage, outputs):
+            # Progress lines + checkpoints, on the scheduler thread
+            if stage == "analyze":
+                checkpoints.save("analyzed", filters, outputs["analysis"])
+                print("[5/10] ✓ Analysis complete")
+            elif stage in ("fetch_100", "fetch_101_200", "load_product_cache"):
+                for name, products in outputs.items():
+                    print(f"[6/10] ✓ {name}: {len(products)} products")
+            elif stage in ("enrich_100", "enrich_101_200"):
+                # checkpoint once both enrichment outputs exist
+                enriched_outputs.update(outputs)
+                if len(enriched_outputs) == 2:
+                    checkpoints.save(
+                        "enriched", enrich_params,
+                        (enriched_outputs["enriched_100"], enriched_outputs["enriched_101_200"]),
+                    )
+                if "enriched_101_200" in outputs:
+                    rows = outputs["enriched_101_200"]
+                    ok = sum(1 for t in rows if t.get("API_Match") is True)
+                    rate = (ok / len(rows) * 100) if rows else 0.0
+                    print(f"[7/10] ✓ Enriched {ok}/{len(rows)} transactions ({rate:.1f}%)")
+            elif stage == "save_enriched_100":
+                print("[8/10] ✓ Saved to: data\\enriched_sales_data_limit_100.txt")
+            elif stage == "save_enriched_101_200":
+                print("[8/10] ✓ Saved to: data\\enriched_sales_data_101_200.txt")
+            elif stage == "report":
+                print("[9/10] ✓ Report saved to: output\\sales_report.txt")
+            elif stage == "rfm_report":
+                print("[9/10] ✓ RFM segments saved to: output\\rfm_segments.txt")
+            elif stage == "basket":
+                print("[9/10] ✓ Product affinity saved to: output\\product_affinity.txt")
+
+        print("[5/10]-[9/10] Analyzing, fetching, enriching and reporting (concurrently)...")
+        pipeline.run(artifacts, on_complete=on_complete)
+        path, seconds = pipeline.critical_path()
+        if path:
+            print(f"Critical path: {' -> '.join(path)} ({seconds:.2f}s)")
         print("")
 
         # [10/10] Complete
@@ -152,13 +328,19 @@ def main() -> None:
         print("Files generated:")
         print(" - output\\analysis_report.txt")
         print(" - output\\sales_report.txt")
+        print(" - output\\rfm_segments.txt")
+        print(" - output\\product_affinity.txt")
+        print(" - output\\anomalies.txt")
         print(" - data\\enriched_sales_data_limit_100.txt")
         print(" - data\\enriched_sales_data_101_200.txt")
         print("=" * 40)
 
+        checkpoints.clear()
+
     except Exception as e:
         print("\n❌ ERROR: Something went wrong, but the program did not crash.")
         print("Details:", str(e))
+        print("Completed stages are checkpointed; rerun to resume (or --fresh to start over).")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,177 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from utils.analytics_server import AnalyticsService, make_handler
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+
+
+def _row(tid, qty=1, price=100, region="North", customer="C001"):
+    return f"{tid}|2024-12-01|P101|Laptop|{qty}|{price}|{customer}|{region}\n"
+
+
+def _append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _summary(service, **params):
+    return json.loads(service.query("/summary", params))
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "sales.txt"
+    path.write_text(HEADER + _row("T001") + _row("T002"), encoding="utf-8")
+    return path
+
+
+def test_tails_complete_lines_only(data_file):
+    service = AnalyticsService(data_file)
+    assert _summary(service)["transactions"] == 2
+
+    # writer pauses mid-line: nothing is consumed
+    _append(data_file, "T003|2024-12-01|P101|Lap")
+    assert not service.refresh()
+    assert not service.refresh()
+    assert json.loads(service.status())["invalid"] == 0
+
+    _append(data_file, "top|3|100|C001|South\n")
+    assert service.refresh()
+    assert _summary(service) == {"total_revenue": 500.0, "transactions": 3}
+    assert _summary(service, region="South")["transactions"] == 1
+
+
+def test_final_takes_unterminated_last_line(tmp_path):
+    path = tmp_path / "sales.txt"
+    path.write_text(HEADER + _row("T001") + _row("T002").rstrip("\n"), encoding="utf-8")
+
+    assert _summary(AnalyticsService(path))["transactions"] == 1
+    assert _summary(AnalyticsService(path, final=True))["transactions"] == 2
+
+
+def test_rewritten_file_is_reloaded(data_file):
+    service = AnalyticsService(data_file)
+
+    data_file.write_text(HEADER + _row("T009"), encoding="utf-8")
+    assert service.refresh()
+
+    assert _summary(service)["transactions"] == 1
+
+
+def test_directory_source_dedups_even_with_one_file(tmp_path):
+    (tmp_path / "a.txt").write_text(HEADER + _row("T001") + _row("T001"), encoding="utf-8")
+    service = AnalyticsService(tmp_path)
+    assert _summary(service)["transactions"] == 1
+
+    # a later file re-sending T001 is dropped; an invalid first copy does not block a re-send
+    (tmp_path / "b.txt").write_text(HEADER + _row("T001") + _row("T002", qty=0), encoding="utf-8")
+    service.refresh()
+    (tmp_path / "c.txt").write_text(HEADER + _row("T002", qty=2), encoding="utf-8")
+    service.refresh()
+
+    status = json.loads(service.status())
+    assert _summary(service) == {"total_revenue": 300.0, "transactions": 2}
+    assert status["duplicates"] == 2
+    assert status["invalid"] == 1
+
+
+def test_single_file_is_not_deduplicated(tmp_path):
+    path = tmp_path / "sales.txt"
+    path.write_text(HEADER + _row("T001") + _row("T001"), encoding="utf-8")
+
+    assert _summary(AnalyticsService(path))["transactions"] == 2
+
+
+def test_cache_invalidated_on_append(data_file):
+    service = AnalyticsService(data_file)
+    before = json.loads(service.status())
+    north = service.query("/summary", {"region": "North"})
+    assert service.query("/summary", {"region": "North"}) is north
+
+    _append(data_file, _row("T003", price=50))
+    service.refresh()
+
+    after = json.loads(service.status())
+    assert after["version"] == before["version"] + 1
+    # only the warmed unfiltered views survive the swap
+    assert after["cached_queries"] == len(AnalyticsService.ENDPOINTS)
+    assert _summary(service, region="North") == {"total_revenue": 250.0, "transactions": 3}
+
+
+def test_cache_key_ignores_unknown_params_and_is_bounded(data_file):
+    service = AnalyticsService(data_file, cache_size=6)
+    warmed = json.loads(service.status())["cached_queries"]
+
+    a = service.query("/top-products", {"n": "1", "utm": "x"})
+    b = service.query("/top-products", {"n": "1", "utm": "y"})
+    assert a is b
+    assert json.loads(service.status())["cached_queries"] == warmed + 1
+
+    for n in range(2, 10):
+        service.query("/top-products", {"n": str(n)})
+    assert json.loads(service.status())["cached_queries"] == 6
+
+
+def test_query_does_not_wait_for_refresh(data_file, monkeypatch):
+    service = AnalyticsService(data_file)
+    started, release = threading.Event(), threading.Event()
+    original = service._warm
+
+    def slow_warm(view):
+        started.set()
+        release.wait(5)
+        return original(view)
+
+    monkeypatch.setattr(service, "_warm", slow_warm)
+    _append(data_file, _row("T003"))
+    refresher = threading.Thread(target=service.refresh)
+    refresher.start()
+    assert started.wait(5)
+
+    # served from the previous version while the refresh is computing
+    assert _summary(service)["transactions"] == 2
+    assert _summary(service, region="East")["transactions"] == 0
+
+    release.set()
+    refresher.join()
+    assert _summary(service)["transactions"] == 3
+
+
+@pytest.fixture
+def server(data_file):
+    service = AnalyticsService(data_file)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as r:
+            return r.status, json.loads(r.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_http_endpoints(server):
+    assert _get(server + "/summary?region=North") == (200, {"total_revenue": 200.0, "transactions": 2})
+    assert _get(server + "/top-products?n=1")[1] == [["Laptop", 2, 200.0]]
+    assert _get(server + "/health")[0] == 200
+    assert _get(server + "/nope")[0] == 404
+
+
+@pytest.mark.parametrize("query", ["/top-products?n=abc", "/summary?min_amount=abc", "/summary?max_amount=x"])
+def test_http_bad_params_are_400(server, query):
+    status, body = _get(server + query)
+
+    assert status == 400
+    assert "error" in body
@@ -0,0 +1,116 @@
+import statistics
+
+import pytest
+
+from utils.anomaly_detector import AnomalyDetector, new_stats, update_stats, z_score
+from utils.file_handler import validate_and_filter
+
+
+def _tx(i, product="P101", region="North", qty=1, price=100.0):
+    return {
+        "transaction_id": f"T{i:03d}",
+        "date": "2024-12-01",
+        "product_id": product,
+        "product_name": "Widget",
+        "quantity": qty,
+        "unit_price": price,
+        "customer_id": "C001",
+        "region": region,
+    }
+
+
+def test_welford_matches_statistics():
+    values = [12.5, 3.0, 7.25, 100.0, 42.0, 0.5, 18.0]
+    stats = new_stats()
+    for x in values:
+        update_stats(stats, x)
+
+    count, mean, m2 = stats
+    assert count == len(values)
+    assert mean == pytest.approx(statistics.mean(values))
+    assert m2 / (count - 1) == pytest.approx(statistics.variance(values))
+
+
+def test_z_score():
+    stats = new_stats()
+    for x in (10, 20, 30, 40, 50):
+        update_stats(stats, x)
+
+    std = statistics.stdev([10, 20, 30, 40, 50])
+    assert z_score(stats, 30) == pytest.approx(0.0)
+    assert z_score(stats, 30 + 2 * std) == pytest.approx(2.0)
+    # not enough history yet
+    assert z_score(stats, 1000, min_count=6) is None
+
+
+def test_z_score_without_variance():
+    stats = new_stats()
+    for _ in range(5):
+        update_stats(stats, 7.0)
+
+    assert z_score(stats, 1000.0) is None
+
+
+def test_product_outlier_is_flagged():
+    detector = AnomalyDetector(z_threshold=3.0)
+    for i, price in enumerate((100, 101, 99, 100, 102, 98)):
+        assert detector.check(_tx(i, price=price), float(price)) is None
+
+    flag = detector.check(_tx(99, price=5000), 5000.0)
+
+    assert flag is not None
+    assert flag["transaction_id"] == "T099"
+    assert flag["reason"].startswith("product P101 z=")
+    assert detector.flagged_count == 1
+
+
+def test_region_only_outlier_is_not_flagged():
+    detector = AnomalyDetector(z_threshold=3.0)
+    # region North sees only cheap P101 rows; P102 is always expensive
+    for i, price in enumerate((100, 101, 99, 100, 102, 98)):
+        detector.check(_tx(i, price=price), float(price))
+    for i, price in enumerate((5000, 5050, 4950, 5000, 5100, 4900)):
+        detector.check(_tx(100 + i, product="P102", region="South", price=price), float(price))
+
+    # normal for its product, extreme for the region
+    assert detector.check(_tx(200, product="P102", region="North", price=5000), 5000.0) is None
+    assert detector.flagged_count == 0
+
+
+def _batch(start, prices):
+    return [_tx(start + i, price=p) for i, p in enumerate(prices)]
+
+
+def test_validate_and_filter_writes_side_file(tmp_path):
+    side = tmp_path / "anomalies.txt"
+    rows = _batch(0, [100, 101, 99, 100, 102, 98, 5000])
+
+    _, _, summary = validate_and_filter(rows, anomaly_file=str(side), verbose=False)
+
+    lines = side.read_text(encoding="utf-8").splitlines()
+    assert summary["anomalies"] == 1
+    assert lines[0].startswith("TransactionID|")
+    assert lines[1].startswith("T006|")
+
+
+def test_shared_detector_keeps_history_and_appends(tmp_path):
+    side = tmp_path / "anomalies.txt"
+    detector = AnomalyDetector()
+
+    # the outlier arrives in a later batch than the history it is scored against
+    _, _, first = validate_and_filter(_batch(0, [100, 101, 99, 100, 102, 98]),
+                                      anomaly_file=str(side), verbose=False, detector=detector)
+    _, _, second = validate_and_filter(_batch(10, [5000]),
+                                       anomaly_file=str(side), verbose=False, detector=detector)
+
+    lines = side.read_text(encoding="utf-8").splitlines()
+    assert (first["anomalies"], second["anomalies"]) == (0, 1)
+    assert len(lines) == 2 and lines[1].startswith("T010|")
+
+
+def test_preview_skips_detection(tmp_path):
+    rows = _batch(0, [100, 101, 99, 100, 102, 98, 5000])
+
+    _, _, summary = validate_and_filter(rows, verbose=False, detect_anomalies=False)
+
+    assert summary["anomalies"] == 0
@@ -0,0 +1,91 @@
+import pytest
+
+from utils.basket_analysis import association_rules, build_basket_matrix, co_occurrence_counts
+
+# C1: A B C | C2: A B | C3: A C | C4: B | C5: D   (C1 buys A twice)
+BASKETS = {
+    "C1": ["A", "A", "B", "C"],
+    "C2": ["A", "B"],
+    "C3": ["A", "C"],
+    "C4": ["B"],
+    "C5": ["D"],
+}
+
+
+def _transactions():
+    return [
+        {"customer_id": cid, "product_id": pid}
+        for cid, products in BASKETS.items()
+        for pid in products
+    ]
+
+
+def _by_rule(rules):
+    return {(r["antecedent"], r["consequent"]): r for r in rules}
+
+
+def test_basket_matrix_is_binary():
+    matrix = build_basket_matrix(_transactions())
+
+    assert matrix["C1"] == frozenset({"A", "B", "C"})
+    assert len(matrix) == 5
+
+
+def test_counts():
+    items, pairs, n = co_occurrence_counts(build_basket_matrix(_transactions()))
+
+    assert n == 5
+    assert items == {"A": 3, "B": 3, "C": 2, "D": 1}
+    assert pairs == {("A", "B"): 2, ("A", "C"): 2, ("B", "C"): 1}
+
+
+def test_support_confidence_lift():
+    rules = _by_rule(association_rules(_transactions()))
+
+    assert set(rules) == {("A", "B"), ("B", "A"), ("A", "C"), ("C", "A"), ("B", "C"), ("C", "B")}
+
+    # support = 2/5, confidence = 2/3, lift = (2/3) / (3/5)
+    assert rules[("A", "B")]["support"] == 0.4
+    assert rules[("A", "B")]["confidence"] == pytest.approx(0.6667)
+    assert rules[("A", "B")]["lift"] == pytest.approx(1.1111)
+    assert rules[("A", "B")]["count"] == 2
+
+    # confidence = 2/2, lift = 1 / (3/5)
+    assert rules[("C", "A")]["confidence"] == 1.0
+    assert rules[("C", "A")]["lift"] == pytest.approx(1.6667)
+    # confidence = 2/3, lift = (2/3) / (2/5)
+    assert rules[("A", "C")]["lift"] == pytest.approx(1.6667)
+
+    # support = 1/5, confidence = 1/3, lift = (1/3) / (2/5)
+    assert rules[("B", "C")]["support"] == 0.2
+    assert rules[("B", "C")]["confidence"] == pytest.approx(0.3333)
+    assert rules[("B", "C")]["lift"] == pytest.approx(0.8333)
+
+
+def test_sorted_by_lift_then_support():
+    rules = association_rules(_transactions())
+
+    keys = [(r["lift"], r["support"]) for r in rules]
+    assert keys == sorted(keys, reverse=True)
+    assert {(r["antecedent"], r["consequent"]) for r in rules[:2]} == {("A", "C"), ("C", "A")}
+
+
+def test_min_support_prunes_items_and_pairs():
+    # min count 1.5: D (1 basket) and B+C (1 basket) drop out
+    items, pairs, _ = co_occurrence_counts(build_basket_matrix(_transactions()), min_support=0.3)
+
+    assert items == {"A": 3, "B": 3, "C": 2}
+    assert pairs == {("A", "B"): 2, ("A", "C"): 2}
+
+    rules = _by_rule(association_rules(_transactions(), min_support=0.3))
+    assert set(rules) == {("A", "B"), ("B", "A"), ("A", "C"), ("C", "A")}
+
+
+def test_min_confidence():
+    rules = association_rules(_transactions(), min_confidence=0.7)
+
+    assert [(r["antecedent"], r["consequent"]) for r in rules] == [("C", "A")]
+
+
+def test_empty():
+    assert association_rules([]) == []
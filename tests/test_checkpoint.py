@@ -0,0 +1,145 @@
+import os
+import pickle
+import shutil
+from pathlib import Path
+
+import pytest
+
+import main
+from utils.checkpoint import MISSING, CheckpointStore, input_digest
+
+SALES_DATA = Path(__file__).resolve().parent.parent / "data" / "sales_data.txt"
+
+
+def test_round_trip(tmp_path):
+    store = CheckpointStore("abc", root=tmp_path)
+    store.save("parsed", {"region": "North"}, [1, 2, 3])
+
+    assert store.load("parsed", {"region": "North"}) == [1, 2, 3]
+    assert store.load("validated", {}) is MISSING
+
+
+def test_params_mismatch_is_missing(tmp_path):
+    store = CheckpointStore("abc", root=tmp_path)
+    store.save("validated", {"region": "North", "min_amount": None}, "north")
+
+    assert store.load("validated", {"region": "South", "min_amount": None}) is MISSING
+    # key order does not matter
+    assert store.load("validated", {"min_amount": None, "region": "North"}) == "north"
+
+
+def test_corrupt_file_is_missing(tmp_path):
+    store = CheckpointStore("abc", root=tmp_path)
+    store.save("parsed", {}, "ok")
+    (tmp_path / "abc" / "parsed.pkl").write_bytes(b"\x80\x05not a pickle")
+
+    assert store.load("parsed", {}) is MISSING
+
+    (tmp_path / "abc" / "parsed.pkl").write_bytes(b"")
+    assert store.load("parsed", {}) is MISSING
+
+
+class Unpicklable:
+    def __reduce__(self):
+        raise pickle.PicklingError("nope")
+
+
+def test_failed_save_keeps_previous_checkpoint(tmp_path):
+    store = CheckpointStore("abc", root=tmp_path)
+    store.save("parsed", {}, "old")
+
+    with pytest.raises(pickle.PicklingError):
+        store.save("parsed", {}, Unpicklable())
+
+    assert store.load("parsed", {}) == "old"
+    # the temp file is removed; only the renamed checkpoint remains
+    assert os.listdir(tmp_path / "abc") == ["parsed.pkl"]
+
+
+def test_clear(tmp_path):
+    store = CheckpointStore("abc", root=tmp_path)
+    other = CheckpointStore("def", root=tmp_path)
+    store.save("parsed", {}, 1)
+    other.save("parsed", {}, 2)
+
+    store.clear()
+    store.clear()  # already gone
+
+    assert store.load("parsed", {}) is MISSING
+    assert other.load("parsed", {}) == 2
+
+
+def test_input_digest_tracks_contents(tmp_path):
+    a = tmp_path / "a.txt"
+    b = tmp_path / "b.txt"
+    a.write_text("x")
+    b.write_text("y")
+
+    d = input_digest([a, b])
+    assert d == input_digest([b, a])
+
+    a.write_text("z")
+    assert input_digest([a, b]) != d
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # main.py uses Windows-style relative paths; on POSIX they are plain file names
+    for sub in ("data", "output"):
+        (tmp_path / sub).mkdir()
+    shutil.copy(SALES_DATA, tmp_path / r"data\sales_data.txt")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("builtins.input", lambda prompt="": "n")
+    return tmp_path
+
+
+def test_main_resumes_from_checkpoints(workdir, monkeypatch, capsys):
+    digest = input_digest([r"data\sales_data.txt"])
+    store_dir = workdir / ".checkpoints" / digest
+    report = main.generate_sales_report
+
+    def broken_report(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(main, "generate_sales_report", broken_report)
+    main.main(["--offline"])
+    out = capsys.readouterr().out
+
+    assert "ERROR" in out and "disk full" in out
+    assert {"parsed.pkl", "validated.pkl", "analyzed.pkl"} <= set(os.listdir(store_dir))
+
+    # the rerun picks up the completed stages instead of recomputing them
+    def no_reload(*args, **kwargs):
+        raise AssertionError("input should come from the checkpoint")
+
+    validate = main.validate_and_filter
+
+    def preview_only(transactions, **kwargs):
+        # the preview pass still runs; the full validation must not
+        assert kwargs.get("detect_anomalies") is False
+        return validate(transactions, **kwargs)
+
+    monkeypatch.setattr(main, "generate_sales_report", report)
+    monkeypatch.setattr(main, "load_sales_data", no_reload)
+    monkeypatch.setattr(main, "validate_and_filter", preview_only)
+    main.main(["--offline"])
+    out = capsys.readouterr().out
+
+    assert "ERROR" not in out
+    assert out.count("(resumed from checkpoint)") == 2
+    assert "Analysis resumed from checkpoint" in out
+    assert "Process Complete!" in out
+    assert (workdir / r"output\sales_report.txt").exists()
+    # checkpoints are dropped once a run completes
+    assert not store_dir.exists()
+
+
+def test_main_fresh_ignores_checkpoints(workdir, monkeypatch, capsys):
+    digest = input_digest([r"data\sales_data.txt"])
+    CheckpointStore(digest).save("parsed", {}, ([], 0, 0))
+
+    main.main(["--offline", "--fresh"])
+    out = capsys.readouterr().out
+
+    assert "resumed" not in out
+    assert "Process Complete!" in out
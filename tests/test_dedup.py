@@ -0,0 +1,45 @@
+import os
+import threading
+
+from utils.dedup import TransactionIdSet
+
+
+def test_in_memory():
+    with TransactionIdSet(max_in_memory=10) as seen:
+        assert seen.add("T1")
+        assert not seen.add("T1")
+        assert seen.add("T2")
+        assert len(seen) == 2
+        assert not seen.spilled
+
+
+def test_spills_to_disk_and_stays_exact(tmp_path):
+    seen = TransactionIdSet(max_in_memory=3, tmp_dir=str(tmp_path))
+    ids = [f"T{i}" for i in range(10)]
+
+    assert [seen.add(t) for t in ids[:5]] == [True] * 5
+    assert seen.spilled
+    # IDs added before and after the spill are both remembered
+    assert not seen.add("T0")
+    assert not seen.add("T4")
+    assert [seen.add(t) for t in ids[5:]] == [True] * 5
+    assert len(seen) == 10
+
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+    seen.close()
+    assert not os.path.exists(files[0])
+
+
+def test_spilled_set_usable_from_another_thread(tmp_path):
+    seen = TransactionIdSet(max_in_memory=1, tmp_dir=str(tmp_path))
+    seen.add("T1")
+    seen.add("T2")
+    results = []
+
+    t = threading.Thread(target=lambda: results.extend([seen.add("T1"), seen.add("T3")]))
+    t.start()
+    t.join()
+
+    assert results == [False, True]
+    seen.close()
@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from utils import external_aggregate
+from utils.data_processor import (
+    customer_analysis,
+    daily_sales_trend,
+    find_peak_sales_day,
+    top_customers,
+)
+from utils.external_aggregate import (
+    customer_analysis_external,
+    daily_sales_trend_external,
+    iter_customer_analysis_external,
+    top_customers_external,
+)
+
+
+def _transactions(n=400, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        rows.append({
+            "transaction_id": f"T{i:04d}",
+            "date": f"2024-12-{rng.randint(1, 28):02d}",
+            "product_id": f"P{rng.randint(101, 110)}",
+            "product_name": f"Product {rng.randint(1, 10)}",
+            "quantity": rng.randint(1, 5),
+            # few distinct prices so total_spent ties (first-seen order) occur
+            "unit_price": rng.choice([100.0, 250.0, 999.99]),
+            "customer_id": f"C{rng.randint(1, 60):03d}",
+            "region": rng.choice(["North", "South", "East", "West"]),
+        })
+    return rows
+
+
+def _normalized(customers):
+    # products_bought comes from a set, so compare it order-insensitively
+    return [
+        (cid, {**info, "products_bought": sorted(info["products_bought"])})
+        for cid, info in customers.items()
+    ]
+
+
+@pytest.mark.parametrize("max_keys", [1, 3, 7, 1000])
+def test_external_matches_in_memory(max_keys, tmp_path):
+    rows = _transactions()
+
+    expected_customers = customer_analysis(rows)
+    got_customers = customer_analysis_external(rows, max_keys=max_keys, tmp_dir=str(tmp_path))
+    assert _normalized(got_customers) == _normalized(expected_customers)
+
+    streamed = dict(iter_customer_analysis_external(rows, max_keys=max_keys, tmp_dir=str(tmp_path)))
+    assert list(streamed) == list(expected_customers)
+
+    top = top_customers_external(rows, n=5, max_keys=max_keys, tmp_dir=str(tmp_path))
+    assert [cid for cid, _ in top] == list(expected_customers)[:5]
+
+    expected_daily = daily_sales_trend(rows)
+    got_daily = daily_sales_trend_external(rows, max_keys=max_keys, tmp_dir=str(tmp_path))
+    assert list(got_daily.items()) == list(expected_daily.items())
+
+
+@pytest.mark.parametrize("max_keys", [1, 3, 7, 1000])
+def test_max_keys_routes_existing_callers(max_keys, monkeypatch):
+    rows = _transactions()
+    calls = []
+
+    for name in ("customer_analysis_external", "daily_sales_trend_external", "top_customers_external"):
+        original = getattr(external_aggregate, name)
+
+        def spy(*args, _name=name, _original=original, **kwargs):
+            calls.append(_name)
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(external_aggregate, name, spy)
+
+    assert _normalized(customer_analysis(rows, max_keys=max_keys)) == _normalized(customer_analysis(rows))
+    assert daily_sales_trend(rows, max_keys=max_keys) == daily_sales_trend(rows)
+    assert find_peak_sales_day(rows, max_keys=max_keys) == find_peak_sales_day(rows)
+    assert top_customers(rows, n=5, max_keys=max_keys) == top_customers(rows, n=5)
+
+    assert calls == [
+        "customer_analysis_external",
+        "daily_sales_trend_external",
+        "daily_sales_trend_external",
+        "top_customers_external",
+    ]
+
+
+def test_peak_day_reuses_trend():
+    rows = _transactions()
+    trend = daily_sales_trend(rows, max_keys=3)
+
+    # no transactions needed when the trend is passed in
+    assert find_peak_sales_day([], trend=trend) == find_peak_sales_day(rows)
@@ -0,0 +1,112 @@
+from decimal import InvalidOperation
+
+import pytest
+
+from utils.file_handler import (
+    _parse_paise,
+    is_multi_source,
+    list_sources,
+    load_sales_data,
+    load_sales_data_many,
+    parse_line,
+    validate_and_filter,
+)
+
+
+@pytest.mark.parametrize("text, paise", [
+    ("1916", 191600),
+    ("173.5", 17350),
+    ("173.05", 17305),
+    (".5", 50),
+    ("0.01", 1),
+    ("+12.3", 1230),
+    ("-12.3", -1230),
+    # Decimal fallback: more decimals (half-up) and exponents
+    ("173.505", 17351),
+    ("173.504", 17350),
+    ("1e3", 100000),
+    ("1.5E2", 15000),
+])
+def test_parse_paise(text, paise):
+    assert _parse_paise(text) == paise
+
+
+@pytest.mark.parametrize("text", ["nan", "NaN", "inf", "-Infinity", "abc", "1.2.3", ""])
+def test_parse_paise_rejects_non_numbers(text):
+    with pytest.raises((ValueError, ArithmeticError, InvalidOperation)):
+        _parse_paise(text)
+
+
+def test_parse_line_strips_thousands_separators():
+    rec = parse_line("T001|2024-12-01|P101|Laptop, Pro|2|1,916|C001|North")
+
+    assert rec["product_name"] == "Laptop Pro"
+    assert rec["unit_price_paise"] == 191600
+    assert rec["unit_price"] == 1916.0
+    assert "amount" not in rec
+
+
+@pytest.mark.parametrize("price", ["nan", "inf", "abc"])
+def test_parse_line_rejects_bad_price(price):
+    assert parse_line(f"T001|2024-12-01|P101|Laptop|2|{price}|C001|North") is None
+
+
+def test_parse_line_rejects_wrong_field_count():
+    assert parse_line("T001|2024-12-01|P101|Laptop|2|100|C001") is None
+
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+
+
+def _write(path, *rows):
+    path.write_text(HEADER + "".join(r + "\n" for r in rows), encoding="utf-8")
+
+
+def _sources(tmp_path):
+    _write(tmp_path / "a.txt",
+           "T001|2024-12-01|P101|Laptop|1|100|C001|North",
+           "T002|2024-12-01|P101|Laptop|0|100|C001|North",   # invalid first copy (qty 0)
+           "bad line")
+    _write(tmp_path / "b.txt",
+           "T001|2024-12-02|P101|Laptop|1|100|C001|North",   # duplicate
+           "T002|2024-12-02|P101|Laptop|2|100|C001|North",   # valid re-send
+           "T003|2024-12-02|P102|Mouse|1|50|C002|South")
+    (tmp_path / "notes.md").write_text("ignored", encoding="utf-8")
+
+
+def test_list_sources(tmp_path):
+    _sources(tmp_path)
+
+    assert [p.name for p in list_sources(tmp_path)] == ["a.txt", "b.txt"]
+    assert [p.name for p in list_sources(str(tmp_path / "b*.txt"))] == ["b.txt"]
+    assert list_sources(tmp_path / "a.txt") == [tmp_path / "a.txt"]
+    assert is_multi_source(tmp_path)
+    assert is_multi_source(str(tmp_path / "*.txt"))
+    assert not is_multi_source(tmp_path / "a.txt")
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+@pytest.mark.parametrize("max_ids", [1, 1_000_000])
+def test_load_many_dedups_valid_rows_only(tmp_path, use_processes, max_ids):
+    _sources(tmp_path)
+
+    records, parsed, invalid, duplicates = load_sales_data_many(
+        tmp_path, max_workers=2, use_processes=use_processes, max_ids_in_memory=max_ids,
+    )
+    valid, bad, _ = validate_and_filter(records, verbose=False, detect_anomalies=False)
+
+    assert (parsed, invalid, duplicates) == (6, 1, 1)
+    assert [(t["transaction_id"], t["quantity"]) for t in valid] == [("T001", 1), ("T002", 2), ("T003", 1)]
+    assert bad == 1  # the qty-0 copy
+
+
+def test_load_sales_data_directory_and_glob_match(tmp_path):
+    _sources(tmp_path)
+
+    from_dir = load_sales_data(tmp_path)
+    from_glob = load_sales_data(str(tmp_path / "*.txt"))
+
+    assert from_dir == from_glob
+    records, parsed, removed = from_dir
+    assert parsed == 6 and removed == 2  # 1 unparseable + 1 duplicate
+    assert len(records) == 4
@@ -0,0 +1,156 @@
+import threading
+import time
+
+import pytest
+
+from utils.pipeline import Pipeline
+
+
+def test_independent_stages_overlap():
+    # each stage blocks until the other one is running too
+    both = threading.Barrier(2, timeout=2)
+
+    def work(tag):
+        both.wait()
+        time.sleep(0.05)
+        return tag
+
+    p = Pipeline(max_workers=2)
+    p.add("left", lambda: work("L"), [], ["l"])
+    p.add("right", lambda: work("R"), [], ["r"])
+    p.add("join", lambda l, r: l + r, ["l", "r"], ["lr"])
+
+    assert p.run()["lr"] == "LR"
+
+    (l0, l1), (r0, r1) = p.timings["left"], p.timings["right"]
+    assert l0 < r1 and r0 < l1
+    assert p.timings["join"][0] >= max(l1, r1)
+
+
+def test_outputs_and_seeded_artifacts():
+    seen = []
+    p = Pipeline()
+    p.add("split", lambda s: (s[:2], s[2:]), ["text"], ["head", "tail"])
+    p.add("log", lambda h: seen.append(h), ["head"])
+
+    out = p.run({"text": "abcd"}, on_complete=lambda name, outputs: seen.append((name, outputs)))
+
+    assert out == {"text": "abcd", "head": "ab", "tail": "cd"}
+    assert ("split", {"head": "ab", "tail": "cd"}) in seen
+    assert ("log", {}) in seen
+    assert "ab" in seen
+
+
+def test_error_waits_for_in_flight_stages():
+    slow_started = threading.Event()
+    completed = []
+
+    def slow():
+        slow_started.set()
+        time.sleep(0.1)
+        return "done"
+
+    def bad():
+        slow_started.wait(2)
+        raise RuntimeError("boom")
+
+    p = Pipeline(max_workers=2)
+    p.add("slow", slow, [], ["s"])
+    p.add("bad", bad, [], ["b"])
+    p.add("after", lambda s: completed.append("after ran"), ["s"])
+
+    with pytest.raises(RuntimeError, match="boom"):
+        p.run(on_complete=lambda name, outputs: completed.append(name))
+
+    # the in-flight stage finished and was reported; later stages were skipped
+    assert completed == ["slow"]
+    assert set(p.timings) == {"slow"}
+
+
+def test_main_executor_runs_on_scheduler_thread():
+    caller = threading.current_thread()
+    threads = {}
+
+    def record(name):
+        threads[name] = threading.current_thread()
+        return name
+
+    p = Pipeline()
+    p.add("inline", lambda: record("inline"), [], ["a"], executor="main")
+    p.add("worker", lambda a: record("worker"), ["a"], ["b"])
+
+    assert p.run()["b"] == "worker"
+    assert threads["inline"] is caller
+    assert threads["worker"] is not caller
+
+
+def test_process_executor():
+    p = Pipeline(max_workers=1)
+    p.add("total", sum, ["nums"], ["total"], executor="process")
+
+    assert p.run({"nums": [1, 2, 3]})["total"] == 6
+
+
+def test_missing_input_is_rejected():
+    p = Pipeline()
+    p.add("report", lambda x: x, ["analysis"])
+
+    with pytest.raises(ValueError, match=r"stage report needs \['analysis'\]"):
+        p.run()
+    # a seeded artifact satisfies it
+    p.run({"analysis": 1})
+
+
+def test_cycle_is_rejected():
+    p = Pipeline()
+    p.add("a", lambda y: y, ["y"], ["x"])
+    p.add("b", lambda x: x, ["x"], ["y"])
+
+    with pytest.raises(ValueError, match="cycle in pipeline"):
+        p.run()
+
+
+def test_duplicate_stage_and_artifact():
+    p = Pipeline()
+    p.add("a", lambda: 1, [], ["x"])
+
+    with pytest.raises(ValueError, match="duplicate stage a"):
+        p.add("a", lambda: 2, [], ["y"])
+    with pytest.raises(ValueError, match="artifact x produced by both a and b"):
+        p.add("b", lambda: 2, [], ["x"])
+    with pytest.raises(ValueError, match="unknown executor"):
+        p.add("c", lambda: 3, executor="fiber")
+
+
+def test_stall_when_an_output_never_appears():
+    p = Pipeline()
+    # declares two outputs but only returns one
+    p.add("short", lambda: ("x",), [], ["x", "y"])
+    p.add("needs_y", lambda y: y, ["y"])
+
+    with pytest.raises(RuntimeError, match=r"pipeline stalled; cannot run \['needs_y'\]"):
+        p.run()
+
+
+def test_critical_path_follows_the_slowest_chain():
+    def sleeper(seconds):
+        def run(*_):
+            time.sleep(seconds)
+            return seconds
+        return run
+
+    p = Pipeline(max_workers=3)
+    p.add("load", sleeper(0.02), [], ["rows"])
+    p.add("fetch", sleeper(0.01), [], ["products"])
+    p.add("analyze", sleeper(0.12), ["rows"], ["analysis"])
+    p.add("enrich", sleeper(0.01), ["rows", "products"], ["enriched"])
+    p.add("report", sleeper(0.02), ["analysis", "enriched"])
+
+    assert p.critical_path() == ([], 0.0)
+    p.run()
+
+    path, total = p.critical_path()
+    assert path == ["load", "analyze", "report"]
+    expected = sum(end - start for name, (start, end) in p.timings.items() if name in path)
+    assert total == pytest.approx(expected)
+    assert total >= 0.16
@@ -0,0 +1,211 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+pytest.importorskip("requests")
+
+from utils.product_client import CircuitBreaker, ProductClient
+
+
+class FakeProductAPI:
+    """
+    Local stand-in for the products API.
+
+    GET /<id> -> 200 {"id": id, ...}; ids >= 1000 -> 404;
+    GET ?limit=N&skip=S -> 200 {"products": [...]} (counted under "list");
+    every request -> 500 while `failing` is set. `delay` slows each response down and
+    on_request() runs inside the handler (to observe client state).
+    """
+
+    def __init__(self):
+        self.hits = Counter()
+        self.failing = False
+        self.delay = 0.0
+        self.on_request = None
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = parse_qs(url.query)
+                pid = "list" if "limit" in query else int(url.path.rstrip("/").rsplit("/", 1)[-1])
+                api.hits[pid] += 1
+                if api.on_request is not None:
+                    api.on_request()
+                time.sleep(api.delay)
+
+                if api.failing:
+                    status, body = 500, {"message": "boom"}
+                elif pid == "list":
+                    skip, limit = int(query.get("skip", ["0"])[0]), int(query["limit"][0])
+                    ids = range(skip + 1, skip + limit + 1)
+                    status, body = 200, {"products": [{"id": i, "title": f"Product {i}"} for i in ids]}
+                elif pid >= 1000:
+                    status, body = 404, {"message": f"Product with id '{pid}' not found"}
+                else:
+                    status, body = 200, {"id": pid, "title": f"Product {pid}"}
+
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/products"
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def api():
+    with FakeProductAPI() as fake:
+        yield fake
+
+
+def _client(api, **kwargs):
+    return ProductClient(base_url=api.url, timeout=2.0, rate=1000, **kwargs)
+
+
+def test_concurrent_lookups_are_coalesced(api):
+    api.delay = 0.2
+    client = _client(api)
+    start = threading.Barrier(10)
+    results = []
+
+    def lookup():
+        start.wait()
+        results.append(client.get_product(7))
+
+    threads = [threading.Thread(target=lookup) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert api.hits[7] == 1
+    assert results == [{"id": 7, "title": "Product 7"}] * 10
+
+    m = client.metrics()
+    assert m["requests"] == 1
+    assert m["cache_misses"] == 1
+    assert m["coalesced"] + m["cache_hits"] == 9
+    assert m["successes"] == 1
+
+
+def test_not_found_is_cached(api):
+    client = _client(api)
+
+    assert client.get_product(1234) is None
+    assert client.get_product(1234) is None
+
+    assert api.hits[1234] == 1
+    m = client.metrics()
+    assert m["not_found"] == 1
+    assert m["cache_hits"] == 1
+    assert m["failures"] == 0
+    assert m["circuit_state"] == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_then_half_opens_then_closes(api):
+    breaker = CircuitBreaker(error_threshold=0.5, window=4, min_calls=2, reset_timeout=0.2)
+    client = _client(api, breaker=breaker)
+
+    # errors open the circuit
+    api.failing = True
+    assert client.get_product(1) is None
+    assert client.get_product(2) is None
+    assert client.metrics()["circuit_state"] == CircuitBreaker.OPEN
+
+    # while open, calls fail fast without reaching the server
+    assert client.get_product(3) is None
+    assert api.hits[3] == 0
+
+    # failures are not cached: the same id is retried once the API is back
+    api.failing = False
+    time.sleep(0.25)
+    states = []
+    api.on_request = lambda: states.append(breaker.state)
+    assert client.get_product(1) == {"id": 1, "title": "Product 1"}
+
+    assert states == [CircuitBreaker.HALF_OPEN]
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert api.hits[1] == 2
+
+    m = client.metrics()
+    assert m["requests"] == 3
+    assert m["failures"] == 2
+    assert m["successes"] == 1
+    assert m["rejected_open_circuit"] == 1
+    assert sum(m["latency_ms"].values()) == 3
+
+
+def test_get_products_skips_missing(api):
+    client = _client(api)
+
+    products = client.get_products([3, 1001, 1, 2])
+
+    assert [p["id"] for p in products] == [3, 1, 2]
+    assert client.metrics()["not_found"] == 1
+
+
+def test_list_products_goes_through_client_and_fills_cache(api):
+    client = _client(api)
+
+    products = client.list_products(limit=5)
+
+    assert [p["id"] for p in products] == [1, 2, 3, 4, 5]
+    assert api.hits["list"] == 1
+    assert client.get_product(3) == {"id": 3, "title": "Product 3"}
+    assert api.hits[3] == 0
+
+    m = client.metrics()
+    assert m["requests"] == 1
+    assert m["successes"] == 1
+    assert m["cache_hits"] == 1
+    assert sum(m["latency_ms"].values()) == 1
+
+
+def test_list_products_failure_trips_breaker(api):
+    breaker = CircuitBreaker(error_threshold=0.5, window=4, min_calls=2, reset_timeout=60)
+    client = _client(api, breaker=breaker)
+    api.failing = True
+
+    assert client.list_products(limit=5) is None
+    assert client.list_products(limit=5) is None
+    assert client.list_products(limit=5) is None
+
+    assert api.hits["list"] == 2
+    m = client.metrics()
+    assert m["failures"] == 2
+    assert m["rejected_open_circuit"] == 1
+    assert m["circuit_state"] == CircuitBreaker.OPEN
+
+
+def test_fetch_all_products_uses_client(api, capsys):
+    from utils.api_handler import fetch_all_products
+
+    client = _client(api)
+    assert [p["id"] for p in fetch_all_products(client)] == list(range(1, 101))
+    assert "fetched products with IDs 1–100" in capsys.readouterr().out
+
+    api.failing = True
+    assert fetch_all_products(_client(api)) == []
+    assert "API fetch failed (limit=100)" in capsys.readouterr().out
@@ -0,0 +1,113 @@
+import pickle
+
+import pytest
+
+from utils.records import API_FIELDS, EnrichedRecord, SalesRecord
+
+
+def _record(**overrides):
+    fields = dict(
+        transaction_id="T001",
+        date="2024-12-01",
+        product_id="P101",
+        product_name="Laptop",
+        quantity=2,
+        unit_price_paise=17350,
+        customer_id="C001",
+        region="North",
+    )
+    fields.update(overrides)
+    return SalesRecord(**fields)
+
+
+def test_item_access_and_derived_unit_price():
+    t = _record()
+
+    assert t["quantity"] == 2
+    assert t["unit_price"] == 173.5
+    assert t["unit_price_paise"] == 17350
+
+
+def test_contains_and_get():
+    t = _record()
+
+    assert "region" in t
+    assert "unit_price" in t
+    assert "amount" not in t  # unset until validation
+    assert "nonsense" not in t
+    assert t.get("date") == "2024-12-01"
+    assert t.get("amount") is None
+    assert t.get("amount", 0.0) == 0.0
+    assert t.get("nonsense", "x") == "x"
+
+
+def test_missing_fields_raise_key_error():
+    t = _record()
+
+    with pytest.raises(KeyError):
+        t["amount"]
+    with pytest.raises(KeyError):
+        t["nonsense"]
+    with pytest.raises(KeyError):
+        t["nonsense"] = 1
+
+
+def test_setitem():
+    t = _record()
+
+    t["amount"] = 347.0
+    t["unit_price"] = 99.99
+
+    assert t["amount"] == 347.0
+    assert "amount" in t
+    assert t["unit_price_paise"] == 9999
+
+
+def test_dict_conversion_matches_plain_dict():
+    t = _record()
+    expected = {
+        "transaction_id": "T001",
+        "date": "2024-12-01",
+        "product_id": "P101",
+        "product_name": "Laptop",
+        "quantity": 2,
+        "unit_price": 173.5,
+        "unit_price_paise": 17350,
+        "customer_id": "C001",
+        "region": "North",
+    }
+
+    assert dict(t) == expected
+    assert list(t) == list(expected)
+    assert len(t) == len(expected)
+    assert t == expected
+    assert t.to_dict() == expected
+
+
+def test_pickle_round_trip():
+    t = _record(amount=347.0)
+
+    assert pickle.loads(pickle.dumps(t, protocol=pickle.HIGHEST_PROTOCOL)) == t
+
+
+def test_enriched_record_passes_through():
+    t = _record()
+    api = {"API_Category": "laptops", "API_Brand": "Apple", "API_Rating": 4.5, "API_Match": True}
+    e = EnrichedRecord(t, api)
+
+    assert e["quantity"] == 2
+    assert e["API_Brand"] == "Apple"
+    assert "API_Match" in e and "region" in e and "amount" not in e
+    assert e.get("amount") is None
+    assert e.get("API_Rating") == 4.5
+    with pytest.raises(KeyError):
+        e["nonsense"]
+
+    d = dict(e)
+    assert list(d)[-len(API_FIELDS):] == list(API_FIELDS)
+    assert d == {**dict(t), **api}
+    assert len(e) == len(t) + len(api)
+
+    # the record is shared, not copied
+    t["amount"] = 347.0
+    assert e["amount"] == 347.0
@@ -0,0 +1,96 @@
+import pytest
+
+from utils.data_processor import rfm_segment_summary, rfm_segmentation
+
+
+def _tx(cid, day, qty=1, price=100.0):
+    return {
+        "transaction_id": f"T{cid}{day}{qty}",
+        "date": f"2024-12-{day:02d}",
+        "product_id": "P101",
+        "product_name": "Widget",
+        "quantity": qty,
+        "unit_price": price,
+        "customer_id": cid,
+        "region": "North",
+    }
+
+
+def test_frequency_ties_share_the_lowest_bucket():
+    # purchase counts 1, 2, 3, 4 and 4: the two 4s tie for the top rank
+    rows = []
+    for cid, count in (("C1", 1), ("C2", 2), ("C3", 3), ("C4", 4), ("C5", 4)):
+        rows += [_tx(cid, 10 + i) for i in range(count)]
+
+    rfm = rfm_segmentation(rows)
+
+    assert {cid: info["f_score"] for cid, info in rfm.items()} == {
+        "C1": 1, "C2": 2, "C3": 3, "C4": 4, "C5": 4,
+    }
+
+
+def test_all_equal_values_score_one():
+    rows = [_tx(f"C{i}", 5) for i in range(10)]
+
+    rfm = rfm_segmentation(rows)
+
+    assert {(r["r_score"], r["f_score"], r["m_score"]) for r in rfm.values()} == {(1, 1, 1)}
+    assert {r["segment"] for r in rfm.values()} == {"Lost / Hibernating"}
+
+
+def test_recency_monetary_and_segments():
+    rows = (
+        # recent, frequent, big spender
+        [_tx("BEST", d, qty=5, price=1000.0) for d in (25, 26, 27, 28)]
+        # long ago, frequent, big spender
+        + [_tx("RISK", d, qty=5, price=900.0) for d in (1, 2, 3, 4)]
+        # single recent small purchase
+        + [_tx("NEW", 28)]
+        # single old small purchase
+        + [_tx("LOST", 1)]
+        + [_tx("MID", 15, qty=2)]
+    )
+
+    rfm = rfm_segmentation(rows, reference_date="2024-12-31")
+
+    assert rfm["BEST"]["recency_days"] == 3
+    assert rfm["BEST"]["monetary"] == 20000.0
+    assert rfm["BEST"]["monetary_paise"] == 2000000
+    assert rfm["BEST"]["segment"] == "Champions"
+    assert rfm["RISK"]["segment"] == "At Risk"
+    assert rfm["NEW"]["segment"] == "New / Recent"
+    assert rfm["LOST"]["segment"] == "Lost / Hibernating"
+    # sorted by combined score, best first
+    assert next(iter(rfm)) == "BEST"
+
+
+def test_undated_rows_are_skipped():
+    rows = [_tx("C1", 3), _tx("C2", 4)]
+    blank = _tx("C2", 5)
+    blank["date"] = ""
+    odd = _tx("C3", 6)
+    odd["date"] = "12/06/2024"
+
+    rfm = rfm_segmentation(rows + [blank, odd])
+
+    assert set(rfm) == {"C1", "C2"}
+    assert rfm["C2"]["frequency"] == 1
+    assert rfm_segmentation([blank]) == {}
+
+
+@pytest.mark.parametrize("max_keys", [1, 3, 1000])
+def test_external_matches_in_memory(max_keys):
+    rows = [_tx(f"C{i % 13}", 1 + i % 28, qty=1 + i % 4, price=50.0 + i % 7) for i in range(200)]
+
+    expected = rfm_segmentation(rows)
+    got = rfm_segmentation(rows, max_keys=max_keys)
+
+    assert list(got.items()) == list(expected.items())
+
+
+def test_segment_summary_sums_paise():
+    rows = [_tx("C1", 1, price=0.1), _tx("C2", 1, price=0.2)]
+
+    summary = rfm_segment_summary(rfm_segmentation(rows))
+
+    assert summary == {"Lost / Hibernating": {"customers": 2, "revenue": 0.3}}
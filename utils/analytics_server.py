@@ -0,0 +1,410 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from utils.data_processor import (
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend,
+)
+from utils.anomaly_detector import AnomalyDetector, save_anomalies
+from utils.dedup import TransactionIdSet
+from utils.file_handler import (
+    is_multi_source,
+    is_valid_transaction,
+    list_sources,
+    parse_line,
+    validate_and_filter,
+)
+
+
+def _decode(raw: bytes) -> str:
+    # Same encodings as read_sales_data, tried in the same order
+    for enc in ("utf-8", "latin-1", "cp1252"):
+        try:
+            return raw.decode(enc)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("utf-8", errors="replace")
+
+
+class _Prefix:
+    """
+    Read-only view of the first n rows of a list that only ever grows.
+
+    refresh() appends to the record list while queries iterate a view of
+    the previous version, so no per-refresh copy of the list is needed.
+    """
+
+    __slots__ = ("rows", "n")
+
+    def __init__(self, rows: List[Any], n: int):
+        self.rows = rows
+        self.n = n
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __iter__(self):
+        return islice(self.rows, self.n)
+
+
+class AnalyticsService:
+    """
+    Keeps the validated (and optionally enriched) dataset in memory and
+    answers analytics queries from a per-filter-set result cache (LRU,
+    at most cache_size entries).
+
+    Source files are tailed: each poll reads only the complete lines
+    appended since the last one, parses and validates them, and bumps the
+    dataset version. A trailing line without a newline is left for a
+    later poll (the writer may be mid-line), unless refresh(final=True)
+    says the files are complete. A file that shrinks is treated as
+    rewritten and the dataset is reloaded from scratch.
+
+    Queries never wait on a refresh: results are computed outside the
+    lock against an immutable view of one version. A refresh builds the
+    new version's unfiltered results first, then swaps view and cache in.
+    """
+
+    # Accepted by every endpoint
+    FILTER_PARAMS = ("region", "min_amount", "max_amount")
+
+    # path -> (handler(records, params), endpoint-specific params)
+    ENDPOINTS = {
+        "/region-sales": (lambda recs, q: region_wise_sales(recs), ()),
+        "/top-products": (lambda recs, q: top_selling_products(recs, n=int(q.get("n", 5))), ("n",)),
+        "/customers": (lambda recs, q: customer_analysis(recs), ()),
+        "/daily-trend": (lambda recs, q: daily_sales_trend(recs), ()),
+        "/summary": (lambda recs, q: {
+            "total_revenue": calculate_total_revenue(recs),
+            "transactions": len(recs),
+        }, ()),
+    }
+
+    def __init__(self, source: str | Path, enrich: bool = False, poll_interval: float = 2.0,
+                 anomaly_file: Optional[str] = None, cache_size: int = 256, final: bool = False):
+        self.source = source
+        self.anomaly_file = anomaly_file
+        self.cache_size = cache_size
+        self.enrich = enrich
+        self.poll_interval = poll_interval
+
+        # _lock guards the published view/cache (held only for dict work);
+        # _refresh_lock serializes loaders
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._product_mapping: Dict[int, Dict[str, Any]] = {}
+        self._seen: Optional[TransactionIdSet] = None
+
+        # Published state (what queries see)
+        self.version = 0
+        self._view = _Prefix([], 0)
+        self._cache: OrderedDict[Tuple, bytes] = OrderedDict()
+
+        if enrich:
+            # Fetched once per process, reused for every append
+            from utils.api_handler import create_product_mapping, fetch_products_101_to_200
+            self._product_mapping = create_product_mapping(fetch_products_101_to_200())
+
+        self._reset()
+        self.refresh(final=final)
+
+    # ---------------- loading ----------------
+    def _reset(self) -> None:
+        # Loader state only; queries keep the old view until the reload
+        # is published
+        self.records: List[Any] = []
+        self.invalid = 0
+        self.duplicates = 0
+        # One detector for the life of the dataset, so appended batches are
+        # scored against everything seen so far
+        self._detector = AnomalyDetector()
+        if self.anomaly_file is not None:
+            save_anomalies([], self.anomaly_file)
+        self._offsets: Dict[Path, int] = {}
+        # Same rule as load_sales_data: a directory or glob is always
+        # deduplicated, even if it holds one file at startup
+        if self._seen is not None:
+            self._seen.close()
+        self._seen = TransactionIdSet() if is_multi_source(self.source) else None
+
+    def _read_new_lines(self, path: Path, final: bool = False) -> Optional[List[str]]:
+        """
+        Complete lines appended since the last read; None if the file
+        shrank. An unterminated last line is only taken when final=True.
+        """
+        size = path.stat().st_size
+        offset = self._offsets.get(path, 0)
+        if size < offset:
+            return None
+        if size == offset:
+            return []
+
+        with open(path, "rb") as f:
+            f.seek(offset)
+            raw = f.read(size - offset)
+
+        end = len(raw) if final else raw.rfind(b"\n") + 1
+        if end == 0:
+            return []
+        self._offsets[path] = offset + end
+
+        lines = _decode(raw[:end]).splitlines()
+        if offset == 0:
+            lines = lines[1:]  # header
+        return [ln.strip() for ln in lines if ln.strip()]
+
+    def refresh(self, final: bool = False) -> bool:
+        """
+        Picks up appended data. Returns True if the dataset changed.
+        final=True treats the files as complete (takes a last line that
+        has no newline yet).
+        """
+        with self._refresh_lock:
+            new_lines = []
+            for path in list_sources(self.source):
+                lines = self._read_new_lines(path, final)
+                if lines is None:
+                    return self._reload(final)
+                new_lines.extend(lines)
+            return self._ingest(new_lines)
+
+    def _reload(self, final: bool) -> bool:
+        self._reset()
+        new_lines = []
+        for path in list_sources(self.source):
+            new_lines.extend(self._read_new_lines(path, final) or [])
+        return self._ingest(new_lines, publish=True)
+
+    def _ingest(self, new_lines: List[str], publish: bool = False) -> bool:
+        if not new_lines and not publish:
+            return False
+
+        parsed = []
+        for ln in new_lines:
+            rec = parse_line(ln)
+            if rec is None:
+                self.invalid += 1
+            elif (self._seen is not None and is_valid_transaction(rec)
+                  and not self._seen.add(rec["transaction_id"])):
+                self.duplicates += 1
+            else:
+                parsed.append(rec)
+
+        valid, invalid, _ = validate_and_filter(
+            parsed, verbose=False, anomaly_file=self.anomaly_file, detector=self._detector,
+        )
+        self.invalid += invalid
+
+        if self.enrich:
+            from utils.api_handler import enrich_sales_data
+            valid = enrich_sales_data(valid, self._product_mapping)
+
+        # Rows past the published view's length are invisible to queries
+        self.records.extend(valid)
+        view = _Prefix(self.records, len(self.records))
+        warm = self._warm(view)
+
+        with self._lock:
+            self.version += 1
+            self._view = view
+            self._cache = OrderedDict(warm)
+        return True
+
+    def _warm(self, view: _Prefix) -> Dict[Tuple, bytes]:
+        # Unfiltered result of every endpoint, computed before the swap
+        return {
+            self._cache_key(path, {}): self._compute(path, view, {})
+            for path in self.ENDPOINTS
+        }
+
+    # ---------------- queries ----------------
+    @staticmethod
+    def _filter(records, region=None, min_amount=None, max_amount=None):
+        # Same semantics as the filter step of validate_and_filter
+        # (bounds are parsed up front so a bad value is a 400 even on no rows)
+        lo = float(min_amount) if min_amount is not None else None
+        hi = float(max_amount) if max_amount is not None else None
+        if region is not None:
+            records = [t for t in records if t["region"] == region]
+        if lo is not None:
+            records = [t for t in records if t["amount"] >= lo]
+        if hi is not None:
+            records = [t for t in records if t["amount"] <= hi]
+        return records
+
+    def _cache_key(self, path: str, params: Dict[str, str]) -> Tuple:
+        _, extra_params = self.ENDPOINTS[path]
+        return (path,) + tuple(params.get(p) for p in self.FILTER_PARAMS + extra_params)
+
+    def _compute(self, path: str, view: _Prefix, params: Dict[str, str]) -> bytes:
+        handler, _ = self.ENDPOINTS[path]
+        records = self._filter(
+            view,
+            region=params.get("region"),
+            min_amount=params.get("min_amount"),
+            max_amount=params.get("max_amount"),
+        )
+        return json.dumps(handler(records, params)).encode("utf-8")
+
+    def query(self, path: str, params: Dict[str, str]) -> bytes:
+        """
+        Returns the JSON body for an endpoint + filter set, computing it
+        only on a cache miss. Raises ValueError for bad parameters.
+        Unrecognised query parameters are ignored (and not part of the
+        cache key).
+        """
+        key = self._cache_key(path, params)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+            view, version = self._view, self.version
+
+        body = self._compute(path, view, params)
+
+        with self._lock:
+            # Only cache results of the version that is still current
+            if self.version == version:
+                self._cache[key] = body
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return body
+
+    def status(self) -> bytes:
+        with self._lock:
+            return json.dumps({
+                "records": len(self._view),
+                "invalid": self.invalid,
+                "duplicates": self.duplicates,
+                "anomalies": self._detector.flagged_count,
+                "version": self.version,
+                "cached_queries": len(self._cache),
+            }).encode("utf-8")
+
+    # ---------------- watcher ----------------
+    def start_watching(self) -> None:
+        def loop():
+            while not self._stop.wait(self.poll_interval):
+                try:
+                    if self.refresh():
+                        print(f"Reloaded: {len(self.records)} records (version {self.version})")
+                except OSError as e:
+                    print("Watch failed:", e)
+
+        self._watcher = threading.Thread(target=loop, name="data-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def make_handler(service: AnalyticsService):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+            try:
+                if url.path == "/health":
+                    body = service.status()
+                    status = 200
+                elif url.path in service.ENDPOINTS:
+                    body = service.query(url.path, params)
+                    status = 200
+                else:
+                    status, body = 404, json.dumps({"error": f"unknown endpoint {url.path}"}).encode()
+            except ValueError as e:
+                status, body = 400, json.dumps({"error": str(e)}).encode()
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def address_string(self):
+            # Unix socket peers have no (host, port)
+            return self.client_address[0] if self.client_address else "unix"
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(source, host="127.0.0.1", port=8050, unix_socket=None, enrich=False, poll_interval=2.0,
+          anomaly_file=None, watch=True):
+    """
+    Loads the dataset once and serves it until interrupted. watch=False
+    serves a fixed snapshot: the files are read as complete (a last line
+    without a newline is kept) and not tailed.
+
+    Endpoints (GET, JSON; all accept region, min_amount, max_amount):
+        /region-sales  /top-products?n=5  /customers  /daily-trend  /summary  /health
+    """
+    start = time.perf_counter()
+    service = AnalyticsService(source, enrich=enrich, poll_interval=poll_interval,
+                               anomaly_file=anomaly_file, final=not watch)
+    print(f"Loaded {len(service.records)} records in {time.perf_counter() - start:.2f}s")
+
+    handler = make_handler(service)
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = ThreadingUnixHTTPServer(unix_socket, handler)
+        print(f"Serving on unix socket {unix_socket}")
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        print(f"Serving on http://{host}:{port}")
+
+    if watch:
+        service.start_watching()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sales analytics server (warm in-memory dataset)")
+    parser.add_argument("source", nargs="?", default=os.path.join("data", "sales_data.txt"),
+                        help="data file, directory or glob")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--unix-socket", default=None)
+    parser.add_argument("--enrich", action="store_true", help="fetch API product data once at startup")
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    parser.add_argument("--anomaly-file", default=None, help="append flagged outlier rows here")
+    parser.add_argument("--no-watch", action="store_true",
+                        help="serve a fixed snapshot of complete files (no tailing)")
+    args = parser.parse_args()
+
+    serve(args.source, host=args.host, port=args.port, unix_socket=args.unix_socket,
+          enrich=args.enrich, poll_interval=args.poll_interval, anomaly_file=args.anomaly_file,
+          watch=not args.no_watch)
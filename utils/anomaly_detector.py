@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import os
+from math import sqrt
+from typing import Any, Dict, List, Optional
+
+
+def new_stats() -> List[float]:
+    """Running stats for one group: [count, mean, M2] (Welford)."""
+    return [0, 0.0, 0.0]
+
+
+def update_stats(stats: List[float], x: float) -> None:
+    """Adds one observation to the running mean/variance in O(1)."""
+    stats[0] += 1
+    delta = x - stats[1]
+    stats[1] += delta / stats[0]
+    stats[2] += delta * (x - stats[1])
+
+
+def z_score(stats: List[float], x: float, min_count: int = 5) -> float | None:
+    """
+    How many standard deviations x is from the group's running mean.
+
+    Returns None until the group has min_count observations, or when the
+    group has no variance yet (nothing to compare against).
+    """
+    count, mean, m2 = stats
+    if count < min_count:
+        return None
+    std = sqrt(m2 / (count - 1))
+    if std == 0:
+        return None
+    return (x - mean) / std
+
+
+class AnomalyDetector:
+    """
+    Online outlier detector for transaction amounts.
+
+    Keeps Welford running stats per product_id and per region, so memory is
+    O(products + regions) regardless of row count. Each row is scored against
+    the history seen *before* it, then added to that history, which lets the
+    check run inside the validation loop without a second pass.
+
+    A row is flagged only when it is an outlier for its product. Region stats
+    mix cheap and expensive products, so a region-level hit alone is normal
+    (e.g. any laptop sale); it is only added to the reason as context.
+    Reuse one detector across batches (e.g. appended files) to keep history.
+    Flagged rows are returned to the caller, not stored; only their count
+    is kept, so memory stays O(groups).
+    """
+
+    def __init__(self, z_threshold: float = 3.0, min_count: int = 5):
+        self.z_threshold = z_threshold
+        self.min_count = min_count
+        self.by_product: Dict[str, List[float]] = {}
+        self.by_region: Dict[str, List[float]] = {}
+        self.flagged_count = 0
+
+    def check(self, t: Dict[str, Any], amount: float) -> Optional[Dict[str, Any]]:
+        """Scores one valid transaction; returns the flagged row, or None."""
+        reasons = []
+        for label, groups, key in (
+            ("product", self.by_product, t["product_id"]),
+            ("region", self.by_region, t["region"]),
+        ):
+            stats = groups.get(key)
+            if stats is None:
+                stats = groups[key] = new_stats()
+
+            z = z_score(stats, amount, self.min_count)
+            if z is not None and abs(z) > self.z_threshold:
+                reasons.append(f"{label} {key} z={z:.2f}")
+
+            update_stats(stats, amount)
+
+        if reasons and reasons[0].startswith("product"):
+            self.flagged_count += 1
+            return {
+                "transaction_id": t["transaction_id"],
+                "date": t.get("date"),
+                "product_id": t["product_id"],
+                "customer_id": t["customer_id"],
+                "region": t["region"],
+                "quantity": t["quantity"],
+                "unit_price": t["unit_price"],
+                "amount": amount,
+                "reason": "; ".join(reasons),
+            }
+        return None
+
+
+def save_anomalies(flagged: List[Dict[str, Any]], filename: str, append: bool = False) -> None:
+    """
+    Writes flagged rows (pipe-delimited). append=True adds to an existing
+    file (header only written if the file is new/empty).
+    """
+    headers = [
+        "TransactionID", "Date", "ProductID", "CustomerID", "Region",
+        "Quantity", "UnitPrice", "Amount", "Reason",
+    ]
+    def v(x):
+        return "" if x is None else str(x)
+
+    write_header = not append or not os.path.exists(filename) or os.path.getsize(filename) == 0
+    with open(filename, "a" if append else "w", encoding="utf-8") as f:
+        if write_header:
+            f.write("|".join(headers) + "\n")
+        for a in flagged:
+            row = [
+                v(a["transaction_id"]),
+                v(a["date"]),
+                v(a["product_id"]),
+                v(a["customer_id"]),
+                v(a["region"]),
+                v(a["quantity"]),
+                v(a["unit_price"]),
+                f"{a['amount']:.2f}",
+                v(a["reason"]),
+            ]
+            f.write("|".join(row) + "\n")
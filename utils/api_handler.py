@@ -1,9 +1,30 @@
-import requests
+import json
+import threading
+from pathlib import Path
+
+from utils.records import EnrichedRecord
 
 BASE_URL = "https://dummyjson.com/products"
 
 
-def fetch_all_products():
+_client = None
+_client_lock = threading.Lock()
+
+
+def _default_client():
+    """
+    One ProductClient per process, shared by both fetches, so they use the
+    same rate limit, circuit breaker, cache and metrics.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            from utils.product_client import ProductClient  # lazy: loads requests
+            _client = ProductClient(BASE_URL, timeout=10)
+        return _client
+
+
+def fetch_all_products(client=None):
     """
     TASK 3.1a (MANDATORY – DO NOT CHANGE)
 
@@ -11,19 +32,24 @@ def fetch_all_products():
     NOTE:
     DummyJSON returns products with IDs 1–100 here.
     Sales ProductIDs are P101–P110, so mapping WILL FAIL.
+
+    Goes through ProductClient.list_products (rate limited, circuit
+    breaker, metrics), like fetch_products_101_to_200.
     """
-    try:
-        response = requests.get(f"{BASE_URL}?limit=100", timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        print("API fetch (limit=100): fetched products with IDs 1–100")
-        return data.get("products", [])
-    except Exception as e:
-        print("API fetch failed (limit=100):", e)
+    if client is None:
+        client = _default_client()
+    products = client.list_products(limit=100)
+
+    if products is None:
+        stats = client.metrics()
+        print(f"API fetch failed (limit=100): failed: {stats['failures']}, "
+              f"circuit {stats['circuit_state']}")
         return []
+    print("API fetch (limit=100): fetched products with IDs 1–100")
+    return products
 
 
-def fetch_products_101_to_200():
+def fetch_products_101_to_200(client=None):
     """
     SUPPORT FUNCTION (DATA COMPATIBILITY FIX)
 
@@ -31,20 +57,68 @@ def fetch_products_101_to_200():
     DummyJSON supports product IDs up to ~194.
 
     This function fetches products with IDs 101–200
-    using single-product API calls.
+    using single-product API calls (via ProductClient: rate limited,
+    concurrent, and failing fast once the API keeps erroring).
+    """
+    if client is None:
+        client = _default_client()
+    products = client.get_products(range(101, 201))
+
+    stats = client.metrics()
+    print("API fetch (101–200): fetched products matching sales ProductIDs")
+    if stats["failures"] or stats["rejected_open_circuit"]:
+        print(f"  (failed: {stats['failures']}, skipped by circuit breaker: {stats['rejected_open_circuit']})")
+    return products
+
+
+def save_product_cache(products_by_source, filename):
+    """
+    Saves fetched API products so later runs can enrich with --offline.
+    products_by_source: {"limit_100": [...], "101_200": [...]}
+
+    Merged into the existing cache by product id; a source that came back
+    empty (fetch failed) keeps its cached products. Nothing is written
+    if every source is empty.
+    Returns True if the cache file was written.
     """
-    products = []
+    if not any(products_by_source.values()):
+        return False
 
-    for pid in range(101, 201):
+    path = Path(filename)
+    cache = {}
+    if path.exists():
         try:
-            r = requests.get(f"{BASE_URL}/{pid}", timeout=5)
-            if r.status_code == 200:
-                products.append(r.json())
-        except Exception:
+            with open(path, encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+
+    for source, products in products_by_source.items():
+        if not products:
             continue
+        merged = {p["id"]: p for p in cache.get(source, [])}
+        merged.update((p["id"], p) for p in products)
+        cache[source] = [merged[pid] for pid in sorted(merged)]
 
-    print("API fetch (101–200): fetched products matching sales ProductIDs")
-    return products
+    # write to a temp file and rename, so a crash never truncates the cache
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    tmp.replace(path)
+    return True
+
+
+def load_product_cache(filename):
+    """
+    Loads products saved by save_product_cache.
+    Returns {} if there is no cache yet (offline runs then enrich nothing).
+    """
+    path = Path(filename)
+    if not path.exists():
+        print(f"No product cache at {path}; skipping enrichment data")
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
 
 
 def create_product_mapping(api_products):
@@ -64,32 +138,41 @@ def enrich_sales_data(transactions, product_mapping):
 
     NOTE:
       product_id, product_name, unit_price, customer_id, region, etc.
+      Rows are not copied: each EnrichedRecord wraps the original row and
+      points at one shared API_* dict per product (side-table).
     """
     enriched = []
+    side_table = {}
 
     for t in transactions:
-        row = dict(t)
-
-        product_id = row.get("product_id", "")
-        try:
-            numeric_id = int(str(product_id).replace("P", ""))
-        except Exception:
-            numeric_id = None
-
-        api_data = product_mapping.get(numeric_id) if numeric_id is not None else None
-
-        if api_data:
-            row["API_Category"] = api_data.get("category")
-            row["API_Brand"] = api_data.get("brand")
-            row["API_Rating"] = api_data.get("rating")
-            row["API_Match"] = True
-        else:
-            row["API_Category"] = None
-            row["API_Brand"] = None
-            row["API_Rating"] = None
-            row["API_Match"] = False
-
-        enriched.append(row)
+        product_id = t.get("product_id", "")
+
+        api_fields = side_table.get(product_id)
+        if api_fields is None:
+            try:
+                numeric_id = int(str(product_id).replace("P", ""))
+            except Exception:
+                numeric_id = None
+
+            api_data = product_mapping.get(numeric_id) if numeric_id is not None else None
+
+            if api_data:
+                api_fields = {
+                    "API_Category": api_data.get("category"),
+                    "API_Brand": api_data.get("brand"),
+                    "API_Rating": api_data.get("rating"),
+                    "API_Match": True,
+                }
+            else:
+                api_fields = {
+                    "API_Category": None,
+                    "API_Brand": None,
+                    "API_Rating": None,
+                    "API_Match": False,
+                }
+            side_table[product_id] = api_fields
+
+        enriched.append(EnrichedRecord(t, api_fields))
 
     return enriched
 
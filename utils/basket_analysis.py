@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from collections import Counter
+from itertools import combinations
+from typing import Any, Dict, List, Tuple
+
+
+def build_basket_matrix(transactions: List[Dict[str, Any]]) -> Dict[str, frozenset]:
+    """
+    Builds a sparse customer x product matrix.
+
+    Only the non-zero cells are stored: one row (frozenset of product_ids)
+    per customer. Repeat purchases of the same product count once
+    (binary matrix), matching how customer_analysis collects products_bought.
+
+    Returns: {customer_id: frozenset(product_id, ...)}
+    """
+    rows: Dict[str, set] = {}
+    for t in transactions:
+        rows.setdefault(t["customer_id"], set()).add(t["product_id"])
+    return {cid: frozenset(products) for cid, products in rows.items()}
+
+
+def co_occurrence_counts(
+    matrix: Dict[str, frozenset],
+    min_support: float = 0.0,
+) -> Tuple[Counter, Counter, int]:
+    """
+    Computes item counts (column sums) and pair counts (X^T X, upper triangle).
+
+    Two passes over the sparse rows, Apriori-style: the first sums the
+    columns, and items below min_support are pruned (no pair containing one
+    can reach min_support). The second expands each basket's frequent
+    items into pairs and feeds them to Counter.update, which counts them
+    in C. The cost is sum(k^2) over baskets of k frequent items. It does
+    not depend on catalog size, and customers who bought a single
+    frequent item cost nothing.
+
+    Returns: (item_counts, pair_counts, n_baskets)
+    """
+    n_baskets = len(matrix)
+    if n_baskets == 0:
+        return Counter(), Counter(), 0
+
+    item_counts: Counter = Counter()
+    for products in matrix.values():
+        item_counts.update(products)
+
+    min_count = min_support * n_baskets
+    rows = matrix.values()
+    if min_count > 0:
+        item_counts = Counter({p: c for p, c in item_counts.items() if c >= min_count})
+        frequent = frozenset(item_counts)
+        rows = (products & frequent for products in rows)
+
+    pair_counts: Counter = Counter()
+    update = pair_counts.update
+    for items in rows:
+        if len(items) > 1:
+            update(combinations(sorted(items), 2))
+
+    # Pairs below min_support are dropped too
+    if min_count > 0:
+        pair_counts = Counter({pair: c for pair, c in pair_counts.items() if c >= min_count})
+
+    return item_counts, pair_counts, n_baskets
+
+
+def association_rules(
+    transactions: List[Dict[str, Any]],
+    min_support: float = 0.0,
+    min_confidence: float = 0.0,
+) -> List[Dict[str, Any]]:
+    """
+    Product co-purchase (market-basket) analysis
+
+    For every frequent pair (A, B) emits rules A -> B and B -> A:
+        support    = baskets with A and B / total baskets
+        confidence = baskets with A and B / baskets with A
+        lift       = confidence / support(B)
+
+    Returns: list of rule dicts sorted by lift, then support (descending)
+    [
+        {'antecedent': 'P101', 'consequent': 'P105', 'support': 0.12,
+         'confidence': 0.5, 'lift': 2.1, 'count': 3},
+        ...
+    ]
+    """
+    matrix = build_basket_matrix(transactions)
+    item_counts, pair_counts, n = co_occurrence_counts(matrix, min_support=min_support)
+
+    rules = []
+    for (a, b), count in pair_counts.items():
+        support = count / n
+        for x, y in ((a, b), (b, a)):
+            confidence = count / item_counts[x]
+            if confidence < min_confidence:
+                continue
+            lift = confidence / (item_counts[y] / n)
+            rules.append({
+                "antecedent": x,
+                "consequent": y,
+                "support": round(support, 4),
+                "confidence": round(confidence, 4),
+                "lift": round(lift, 4),
+                "count": count,
+            })
+
+    rules.sort(key=lambda r: (r["lift"], r["support"]), reverse=True)
+    return rules
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable
+
+MISSING = object()
+
+
+def input_digest(paths: Iterable[str | Path]) -> str:
+    """sha256 over the names and contents of the input files."""
+    h = hashlib.sha256()
+    for p in sorted(Path(p) for p in paths):
+        h.update(str(p).encode("utf-8"))
+        with open(p, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def params_key(params: dict) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """
+    Stage-level checkpoints for one pipeline input.
+
+    Layout: <root>/<input digest>/<stage>.pkl, each file holding
+    (params_key, value) pickled with the highest protocol. A checkpoint
+    is only reused when both the input hash and the stage parameters
+    (filters, offline flag, ...) match. Writes go to a temp file and are
+    renamed into place, so a crash mid-write never leaves a corrupt stage.
+    """
+
+    def __init__(self, digest: str, root: str | Path = ".checkpoints"):
+        self.dir = Path(root) / digest
+
+    def load(self, stage: str, params: dict) -> Any:
+        """Returns the saved value, or MISSING."""
+        path = self.dir / f"{stage}.pkl"
+        if not path.exists():
+            return MISSING
+        try:
+            with open(path, "rb") as f:
+                key, value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return MISSING
+        return value if key == params_key(params) else MISSING
+
+    def save(self, stage: str, params: dict, value: Any) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{stage}_", dir=self.dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((params_key(params), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.dir / f"{stage}.pkl")
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def clear(self) -> None:
+        shutil.rmtree(self.dir, ignore_errors=True)
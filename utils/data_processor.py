@@ -1,16 +1,34 @@
+from bisect import bisect_left
+from datetime import date, timedelta
+from itertools import islice
+from math import ceil, log
 from typing import List, Dict
 
 
+# Money is aggregated as integer paise (exact) and converted to rupees
+# only once per result; formatting happens in report_generator._fmt_money.
+def _amount_paise(t) -> int:
+    """Quantity * UnitPrice in integer paise for one transaction."""
+    paise = t.get("unit_price_paise")
+    if paise is None:
+        paise = round(t["unit_price"] * 100)
+    return t["quantity"] * paise
+
+
+def _to_rupees(paise: int) -> float:
+    return paise / 100
+
+
 def compute_revenue_per_category(transactions: List[Dict]) -> Dict[str, float]:
     revenue = {}
 
     for t in transactions:
         category = t["product_id"]
-        amount = t["quantity"] * t["unit_price"]
+        amount = _amount_paise(t)
 
         revenue[category] = revenue.get(category, 0) + amount
 
-    return revenue
+    return {category: _to_rupees(paise) for category, paise in revenue.items()}
 
 
 def top_selling_product(transactions: List[Dict]):
@@ -29,7 +47,7 @@ def sales_distribution_by_region(transactions: List[Dict]) -> Dict[str, float]:
     total_revenue = 0
 
     for t in transactions:
-        amount = t["quantity"] * t["unit_price"]
+        amount = _amount_paise(t)
         region = t["region"]
 
         region_revenue[region] = region_revenue.get(region, 0) + amount
@@ -50,12 +68,7 @@ def calculate_total_revenue(transactions):
     Returns: float (total revenue)
     Sum of (Quantity * UnitPrice) across all transactions
     """
-    total = 0.0
-
-    for t in transactions:
-        total += t["quantity"] * t["unit_price"]
-
-    return total
+    return _to_rupees(sum(map(_amount_paise, transactions)))
 # Task 3 2.1 b.
 def region_wise_sales(transactions):
     """
@@ -66,18 +79,18 @@ def region_wise_sales(transactions):
     and percentage contribution per region.
     """
     region_data = {}
-    overall_sales = 0.0
+    overall_sales = 0
 
-    # Step 1: Aggregate totals per region
+    # Step 1: Aggregate totals per region (in paise)
     for t in transactions:
         region = t["region"]
-        amount = t["quantity"] * t["unit_price"]
+        amount = _amount_paise(t)
 
         overall_sales += amount
 
         if region not in region_data:
             region_data[region] = {
-                "total_sales": 0.0,
+                "total_sales": 0,
                 "transaction_count": 0
             }
 
@@ -89,6 +102,7 @@ def region_wise_sales(transactions):
         region_total = region_data[region]["total_sales"]
         percentage = (region_total / overall_sales) * 100 if overall_sales > 0 else 0
         region_data[region]["percentage"] = round(percentage, 2)
+        region_data[region]["total_sales"] = _to_rupees(region_total)
 
     # Step 3: Sort by total_sales descending
     sorted_region_data = dict(
@@ -115,10 +129,10 @@ def top_selling_products(transactions, n=5):
     for t in transactions:
         name = t["product_name"]
         qty = t["quantity"]
-        amount = t["quantity"] * t["unit_price"]
+        amount = _amount_paise(t)
 
         if name not in product_stats:
-            product_stats[name] = {"total_qty": 0, "total_revenue": 0.0}
+            product_stats[name] = {"total_qty": 0, "total_revenue": 0}
 
         product_stats[name]["total_qty"] += qty
         product_stats[name]["total_revenue"] += amount
@@ -126,7 +140,7 @@ def top_selling_products(transactions, n=5):
     # Step 2: convert to list of tuples
     result = []
     for name, stats in product_stats.items():
-        result.append((name, stats["total_qty"], round(stats["total_revenue"], 2)))
+        result.append((name, stats["total_qty"], _to_rupees(stats["total_revenue"])))
 
     # Step 3: sort by total quantity sold (descending)
     result.sort(key=lambda x: x[1], reverse=True)
@@ -135,38 +149,50 @@ def top_selling_products(transactions, n=5):
     return result[:n]
 
 # Task 3 2.1 d.
-def customer_analysis(transactions):
+def customer_analysis(transactions, max_keys=None):
     """
     Analyzes customer purchase patterns
 
+    max_keys: if set, aggregate out of core with at most this many
+    customers held in memory (utils.external_aggregate); same result.
+
     Returns: dictionary of customer statistics
     """
+    if max_keys is not None:
+        from utils.external_aggregate import customer_analysis_external
+        return customer_analysis_external(transactions, max_keys=max_keys)
+
     customers = {}
 
     # Step 1: aggregate by customer_id
     for t in transactions:
         cid = t["customer_id"]
         product = t["product_name"]
-        amount = t["quantity"] * t["unit_price"]
+        amount = _amount_paise(t)
 
         if cid not in customers:
             customers[cid] = {
-                "total_spent": 0.0,
+                "total_spent": 0,
                 "purchase_count": 0,
-                "products_bought": set()
+                "products_bought": set(),
+                "last_purchase_date": ""
             }
 
         customers[cid]["total_spent"] += amount
         customers[cid]["purchase_count"] += 1
         customers[cid]["products_bought"].add(product)
 
+        # ISO dates compare correctly as strings
+        if t.get("date", "") > customers[cid]["last_purchase_date"]:
+            customers[cid]["last_purchase_date"] = t["date"]
+
     # Step 2: compute average order value & convert set → list
     for cid, data in customers.items():
         data["avg_order_value"] = round(
-            data["total_spent"] / data["purchase_count"], 2
+            _to_rupees(data["total_spent"]) / data["purchase_count"], 2
         )
         data["products_bought"] = list(data["products_bought"])
-        data["total_spent"] = round(data["total_spent"], 2)
+        data["total_spent"] = _to_rupees(data["total_spent"])
 
     # Step 3: sort customers by total_spent descending
     sorted_customers = dict(
@@ -179,11 +205,35 @@ def customer_analysis(transactions):
 
     return sorted_customers
 
+
+def top_customers(transactions, n=5, max_keys=None):
+    """
+    Top n customers by total spent (customer_analysis order)
+
+    With max_keys set, only a heap of n customers is kept after the
+    out-of-core group-by, instead of sorting every customer.
+
+    Returns: list of tuples (Rank, CustomerID, TotalSpent, PurchaseCount)
+    """
+    if max_keys is not None:
+        from utils.external_aggregate import top_customers_external
+        ranked = top_customers_external(transactions, n=n, max_keys=max_keys)
+    else:
+        ranked = islice(customer_analysis(transactions).items(), n)
+
+    return [
+        (rank, cid, info["total_spent"], info["purchase_count"])
+        for rank, (cid, info) in enumerate(ranked, start=1)
+    ]
+
 # Task 3 2.2 a.
-def daily_sales_trend(transactions):
+def daily_sales_trend(transactions, max_keys=None):
     """
     Analyzes sales trends by date
 
+    max_keys: if set, aggregate out of core with at most this many dates
+    held in memory (utils.external_aggregate); same result.
+
     Returns: dictionary sorted by date (chronologically)
 
     Output:
@@ -192,16 +242,20 @@ def daily_sales_trend(transactions):
         ...
     }
     """
+    if max_keys is not None:
+        from utils.external_aggregate import daily_sales_trend_external
+        return daily_sales_trend_external(transactions, max_keys=max_keys)
+
     daily = {}
 
     for t in transactions:
         date = t["date"]
-        amount = t["quantity"] * t["unit_price"]
+        amount = _amount_paise(t)
         customer = t["customer_id"]
 
         if date not in daily:
             daily[date] = {
-                "revenue": 0.0,
+                "revenue": 0,
                 "transaction_count": 0,
                 "unique_customers_set": set()
             }
@@ -214,7 +268,7 @@ def daily_sales_trend(transactions):
     final = {}
     for date, data in daily.items():
         final[date] = {
-            "revenue": round(data["revenue"], 2),
+            "revenue": _to_rupees(data["revenue"]),
             "transaction_count": data["transaction_count"],
             "unique_customers": len(data["unique_customers_set"])
         }
@@ -224,13 +278,17 @@ def daily_sales_trend(transactions):
     return final_sorted
 
 # Task 3 2.2 b.
-def find_peak_sales_day(transactions):
+def find_peak_sales_day(transactions, max_keys=None, trend=None):
     """
     Identifies the date with highest revenue
 
+    trend: an already computed daily_sales_trend result, to avoid a
+    second aggregation pass.
+
     Returns: tuple (date, revenue, transaction_count)
     """
-    trend = daily_sales_trend(transactions)
+    if trend is None:
+        trend = daily_sales_trend(transactions, max_keys=max_keys)
 
     if not trend:
         return ("", 0.0, 0)
@@ -251,10 +309,10 @@ def low_performing_products(transactions, threshold=10):
     for t in transactions:
         name = t["product_name"]
         qty = t["quantity"]
-        amount = t["quantity"] * t["unit_price"]
+        amount = _amount_paise(t)
 
         if name not in stats:
-            stats[name] = {"qty": 0, "revenue": 0.0}
+            stats[name] = {"qty": 0, "revenue": 0}
 
         stats[name]["qty"] += qty
         stats[name]["revenue"] += amount
@@ -262,8 +320,244 @@ def low_performing_products(transactions, threshold=10):
     low = []
     for name, s in stats.items():
         if s["qty"] < threshold:
-            low.append((name, s["qty"], round(s["revenue"], 2)))
+            low.append((name, s["qty"], _to_rupees(s["revenue"])))
 
     # Sort by quantity ascending
     low.sort(key=lambda x: x[1])
     return low
+
+# RFM segmentation (built on customer_analysis)
+RFM_SEGMENTS = [
+    # (min R score, min F score, min M score, label) - first match wins
+    (4, 4, 4, "Champions"),
+    (3, 4, 3, "Loyal Customers"),
+    (4, 1, 1, "New / Recent"),
+    (3, 2, 2, "Potential Loyalists"),
+    (1, 4, 4, "At Risk"),
+    (2, 1, 1, "Needs Attention"),
+]
+
+
+class _RankSketch:
+    """
+    Streaming rank sketch for RFM scoring.
+
+    Counts values instead of storing and sorting them. It stays exact while
+    there are at most max_bins distinct values (frequency and recency
+    nearly always are). Past that it collapses to log-spaced bins
+    (relative error about gamma - 1, as in DDSketch), so memory is bounded
+    by the number of bins rather than the number of customers.
+    """
+
+    def __init__(self, max_bins=10_000, gamma=1.01):
+        self.max_bins = max_bins
+        self.log_gamma = log(gamma)
+        self.exact = True
+        self.counts = {}
+        self.n = 0
+        self._keys = None
+        self._below = None
+
+    def _key(self, v):
+        if self.exact:
+            return v
+        # (sign, bin) keeps ordering across negative / zero / positive values
+        if v > 0:
+            return (1, ceil(log(v) / self.log_gamma))
+        if v < 0:
+            return (-1, -ceil(log(-v) / self.log_gamma))
+        return (0, 0)
+
+    def add(self, v):
+        k = self._key(v)
+        self.counts[k] = self.counts.get(k, 0) + 1
+        self.n += 1
+        if self.exact and len(self.counts) > self.max_bins:
+            self.exact = False
+            collapsed = {}
+            for value, c in self.counts.items():
+                bk = self._key(value)
+                collapsed[bk] = collapsed.get(bk, 0) + c
+            self.counts = collapsed
+
+    def freeze(self):
+        # sorts distinct keys (bins), not customers
+        self._keys = sorted(self.counts)
+        self._below = [0]
+        for k in self._keys:
+            self._below.append(self._below[-1] + self.counts[k])
+
+    def count_below(self, v):
+        """Number of values strictly lower than v (ties are not counted)."""
+        return self._below[bisect_left(self._keys, self._key(v))]
+
+
+def _score(sketch, value, buckets):
+    """
+    1..buckets by percentile rank. Rank counts only strictly lower values,
+    so tied values share the lowest bucket they reach (if every customer
+    bought once, every F score is 1).
+    """
+    if sketch.n == 0:
+        return 1
+    return 1 + (sketch.count_below(value) * buckets) // sketch.n
+
+
+def _iso_date(d, cache):
+    """True if d is a 'YYYY-MM-DD' date (checked once per distinct string)."""
+    ok = cache.get(d)
+    if ok is None:
+        try:
+            ok = len(d) == 10 and date.fromisoformat(d) is not None
+        except (TypeError, ValueError):
+            ok = False
+        cache[d] = ok
+    return ok
+
+
+def _dated(transactions):
+    """Rows with a usable date; RFM skips undated rows (no recency)."""
+    cache = {}
+    return (t for t in transactions if _iso_date(t.get("date") or "", cache))
+
+
+def _rfm_reference(latest, reference_date):
+    if reference_date is not None:
+        return date.fromisoformat(reference_date)
+    return date.fromisoformat(latest) + timedelta(days=1)
+
+
+def _rfm_scored(stats, ref, buckets, max_bins):
+    """
+    Scores per-customer stats. stats() returns a fresh iterable of
+    (customer_id, last_date, frequency, paise); it is read twice (sketch
+    pass, then scoring pass), so it may come from memory or a disk run.
+
+    Yields: (customer_id, rfm row)
+    """
+    # rank sketches per metric
+    # (recency is negated so that "more recent" scores higher)
+    recency_cache = {}
+
+    def recency(d):
+        days = recency_cache.get(d)
+        if days is None:
+            days = recency_cache[d] = (ref - date.fromisoformat(d)).days
+        return days
+
+    r_sketch = _RankSketch(max_bins)
+    f_sketch = _RankSketch(max_bins)
+    m_sketch = _RankSketch(max_bins)
+    for _, last, freq, spent in stats():
+        r_sketch.add(-recency(last))
+        f_sketch.add(freq)
+        m_sketch.add(spent)
+    for sketch in (r_sketch, f_sketch, m_sketch):
+        sketch.freeze()
+
+    # score + label
+    for cid, last, freq, spent in stats():
+        days = recency(last)
+        r = _score(r_sketch, -days, buckets)
+        f = _score(f_sketch, freq, buckets)
+        m = _score(m_sketch, spent, buckets)
+
+        segment = "Lost / Hibernating"
+        for min_r, min_f, min_m, label in RFM_SEGMENTS:
+            if r >= min_r and f >= min_f and m >= min_m:
+                segment = label
+                break
+
+        yield cid, {
+            "last_purchase_date": last,
+            "recency_days": days,
+            "frequency": freq,
+            "monetary": _to_rupees(spent),
+            "monetary_paise": spent,
+            "r_score": r,
+            "f_score": f,
+            "m_score": m,
+            "rfm": f"{r}{f}{m}",
+            "segment": segment,
+        }
+
+
+def _rfm_rank(item):
+    # combined score, then monetary value (both descending)
+    _, row = item
+    return -(row["r_score"] + row["f_score"] + row["m_score"]), -row["monetary_paise"]
+
+
+def rfm_segmentation(transactions, reference_date=None, buckets=5, max_bins=10_000, max_keys=None):
+    """
+    Customer-level RFM (Recency, Frequency, Monetary) segmentation
+
+    reference_date: 'YYYY-MM-DD' (defaults to the day after the latest
+    transaction). Scores run 1..buckets, higher is better for all three
+    (a recent purchase gets a high R score). Segment labels in
+    RFM_SEGMENTS assume the default 5 buckets. Rows without a valid
+    ISO date are skipped.
+
+    Memory: one compact (last_date, count, paise) tuple per customer; the
+    quantile step uses _RankSketch, whose size is bounded by max_bins.
+    With max_keys set, grouping and sorting run out of core
+    (utils.external_aggregate) instead. Either way the returned dict
+    holds one row per customer.
+
+    Returns: dictionary sorted by RFM score descending
+    {
+        'C001': {'last_purchase_date': '2024-12-29', 'recency_days': 1,
+                 'frequency': 4, 'monetary': 12345.0, 'monetary_paise': 1234500,
+                 'r_score': 5, 'f_score': 4, 'm_score': 5,
+                 'rfm': '545', 'segment': 'Champions'},
+        ...
+    }
+    """
+    if max_keys is not None:
+        from utils.external_aggregate import rfm_segmentation_external
+        return rfm_segmentation_external(transactions, reference_date, buckets, max_bins, max_keys=max_keys)
+
+    # lean single pass - [last_date, count, spent] per customer.
+    # Avoids the per-customer product sets customer_analysis builds.
+    stats = {}
+    for t in _dated(transactions):
+        cid = t["customer_id"]
+        d = t["date"]
+        amount = _amount_paise(t)
+
+        s = stats.get(cid)
+        if s is None:
+            stats[cid] = [d, 1, amount]
+        else:
+            if d > s[0]:
+                s[0] = d
+            s[1] += 1
+            s[2] += amount
+
+    if not stats:
+        return {}
+
+    ref = _rfm_reference(max(s[0] for s in stats.values()), reference_date)
+    rows = [(cid, last, freq, spent) for cid, (last, freq, spent) in stats.items()]
+    del stats
+    scored = list(_rfm_scored(lambda: rows, ref, buckets, max_bins))
+    scored.sort(key=_rfm_rank)
+    return dict(scored)
+
+
+def rfm_segment_summary(rfm):
+    """
+    Counts customers and revenue per RFM segment
+
+    Returns: dict {segment: {'customers': n, 'revenue': x}} sorted by revenue
+    """
+    summary = {}
+    for info in rfm.values():
+        seg = summary.setdefault(info["segment"], {"customers": 0, "revenue": 0})
+        seg["customers"] += 1
+        seg["revenue"] += info["monetary_paise"]
+
+    for seg in summary.values():
+        seg["revenue"] = _to_rupees(seg["revenue"])
+
+    return dict(sorted(summary.items(), key=lambda x: x[1]["revenue"], reverse=True))
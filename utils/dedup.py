@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from typing import Optional
+
+
+class TransactionIdSet:
+    """
+    Exact "seen before?" set for TransactionIDs with a bounded memory budget.
+
+    IDs are kept in a plain Python set until max_in_memory is reached. After
+    that the set is spilled to an on-disk SQLite table (primary key lookup),
+    and new IDs go there too. Lookups stay exact in both modes.
+    """
+
+    def __init__(self, max_in_memory: int = 1_000_000, tmp_dir: Optional[str] = None):
+        self.max_in_memory = max_in_memory
+        self.tmp_dir = tmp_dir
+        self._mem: set = set()
+        self._db = None  # sqlite3.Connection once spilled
+        self._db_path: Optional[str] = None
+        self._count = 0
+
+    @property
+    def spilled(self) -> bool:
+        return self._db is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, tid: str) -> bool:
+        """Adds tid; returns True if it was new, False if it is a duplicate."""
+        if self._db is None:
+            if tid in self._mem:
+                return False
+            self._mem.add(tid)
+            self._count += 1
+            if len(self._mem) > self.max_in_memory:
+                self._spill()
+            return True
+
+        cur = self._db.execute("INSERT OR IGNORE INTO seen(tid) VALUES (?)", (tid,))
+        if cur.rowcount == 1:
+            self._count += 1
+            return True
+        return False
+
+    def _spill(self) -> None:
+        import sqlite3  # only needed past the in-memory budget
+
+        fd, self._db_path = tempfile.mkstemp(prefix="txn_ids_", suffix=".sqlite", dir=self.tmp_dir)
+        os.close(fd)
+        # callers serialize access; the set may be filled from several threads
+        self._db = sqlite3.connect(self._db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute("CREATE TABLE seen (tid TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._db.executemany("INSERT INTO seen(tid) VALUES (?)", ((t,) for t in self._mem))
+        self._mem = set()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            os.remove(self._db_path)
+
+    def __enter__(self) -> "TransactionIdSet":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
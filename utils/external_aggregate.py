@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import heapq
+import os
+import pickle
+import tempfile
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.data_processor import (
+    _amount_paise,
+    _dated,
+    _rfm_rank,
+    _rfm_reference,
+    _rfm_scored,
+    _to_rupees,
+)
+
+
+# ---------------- Sorted runs on disk ----------------
+
+def _write_run(items: Iterable[Any], tmp_dir: str) -> str:
+    """Writes already-sorted items to a temp file (pickle stream)."""
+    fd, path = tempfile.mkstemp(prefix="run_", suffix=".pkl", dir=tmp_dir)
+    with os.fdopen(fd, "wb") as f:
+        for item in items:
+            pickle.dump(item, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: str) -> Iterator[Any]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def external_sort(
+    items: Iterable[Any],
+    key: Callable[[Any], Any],
+    max_items: int = 100_000,
+    tmp_dir: Optional[str] = None,
+) -> Iterator[Any]:
+    """
+    Stable sort of an arbitrarily large iterable.
+
+    Buffers up to max_items, spills each full buffer as a sorted run and
+    k-way merges the runs with a heap. Equal keys keep their input order
+    (same result as sorted(items, key=key)).
+    """
+    seq = count()
+    buffer: List[Tuple[Any, int, Any]] = []
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as run_dir:
+        runs = []
+        for item in items:
+            buffer.append((key(item), next(seq), item))
+            if len(buffer) >= max_items:
+                buffer.sort(key=lambda x: x[:2])
+                runs.append(_write_run(buffer, run_dir))
+                buffer = []
+
+        buffer.sort(key=lambda x: x[:2])
+        if not runs:
+            for _, _, item in buffer:
+                yield item
+            return
+
+        runs.append(_write_run(buffer, run_dir))
+        buffer = []
+        merged = heapq.merge(*(_read_run(r) for r in runs), key=lambda x: x[:2])
+        for _, _, item in merged:
+            yield item
+
+
+def external_group_by(
+    items: Iterable[Any],
+    key_fn: Callable[[Any], Any],
+    init_fn: Callable[[], Any],
+    update_fn: Callable[[Any, Any], None],
+    merge_fn: Callable[[Any, Any], Any],
+    max_keys: int = 100_000,
+    tmp_dir: Optional[str] = None,
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Group-by aggregation under a memory budget.
+
+    Partial aggregates are kept in a dict of at most max_keys groups. When
+    it is full, it is written to disk as a run sorted by key and cleared.
+    The runs are then k-way merged and equal keys combined with merge_fn.
+
+    Yields: (key, aggregate) in ascending key order
+    """
+    partial: Dict[Any, Any] = {}
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as run_dir:
+        runs = []
+        for item in items:
+            k = key_fn(item)
+            agg = partial.get(k)
+            if agg is None:
+                agg = partial[k] = init_fn()
+            update_fn(agg, item)
+
+            if len(partial) >= max_keys:
+                runs.append(_write_run(sorted(partial.items(), key=lambda x: x[0]), run_dir))
+                partial = {}
+
+        if not runs:
+            yield from sorted(partial.items(), key=lambda x: x[0])
+            return
+
+        if partial:
+            runs.append(_write_run(sorted(partial.items(), key=lambda x: x[0]), run_dir))
+            partial = {}
+
+        merged = heapq.merge(*(_read_run(r) for r in runs), key=lambda x: x[0])
+        current_key, current = next(merged)
+        for k, agg in merged:
+            if k == current_key:
+                current = merge_fn(current, agg)
+            else:
+                yield current_key, current
+                current_key, current = k, agg
+        yield current_key, current
+
+
+# ---------------- Out-of-core versions of data_processor functions ----------------
+
+def _customer_groups(transactions, max_keys, tmp_dir):
+    """
+    Out-of-core customer group-by.
+
+    Yields: (first_seen, customer_id, data) in customer_id order, where data
+    matches a customer_analysis row and first_seen is the index of the
+    customer's first transaction (the tie-break customer_analysis uses).
+    """
+    # agg: [first_seen, total_paise, purchase_count, products, last_date]
+    def init():
+        return [None, 0, 0, set(), ""]
+
+    def update(agg, indexed):
+        i, t = indexed
+        if agg[0] is None:
+            agg[0] = i
+        agg[1] += _amount_paise(t)
+        agg[2] += 1
+        agg[3].add(t["product_name"])
+        if t.get("date", "") > agg[4]:
+            agg[4] = t["date"]
+
+    def merge(a, b):
+        return [min(a[0], b[0]), a[1] + b[1], a[2] + b[2], a[3] | b[3], max(a[4], b[4])]
+
+    grouped = external_group_by(
+        enumerate(transactions), lambda x: x[1]["customer_id"],
+        init, update, merge, max_keys=max_keys, tmp_dir=tmp_dir,
+    )
+    for cid, (first_seen, paise, cnt, products, last) in grouped:
+        data = {
+            "total_spent": _to_rupees(paise),
+            "purchase_count": cnt,
+            "products_bought": list(products),
+            "last_purchase_date": last,
+        }
+        data["avg_order_value"] = round(_to_rupees(paise) / cnt, 2)
+        yield first_seen, cid, data
+
+
+def _customer_rank(group):
+    # Same order as customer_analysis: total_spent desc, ties by first appearance
+    first_seen, _, data = group
+    return -data["total_spent"], first_seen
+
+
+def iter_customer_analysis_external(transactions, max_keys=100_000, tmp_dir=None):
+    """
+    Streams customer_analysis rows as (customer_id, data), in the same
+    order, without holding every customer in memory at once.
+    """
+    ranked = external_sort(_customer_groups(transactions, max_keys, tmp_dir),
+                           key=_customer_rank, max_items=max_keys, tmp_dir=tmp_dir)
+    for _, cid, data in ranked:
+        yield cid, data
+
+
+def customer_analysis_external(transactions, max_keys=100_000, tmp_dir=None):
+    """
+    Out-of-core customer_analysis (same output, bounded memory while
+    aggregating). transactions may be any iterable, e.g. a streaming reader.
+    The returned dict has a row per customer; use
+    iter_customer_analysis_external to consume the rows without it.
+    """
+    return dict(iter_customer_analysis_external(transactions, max_keys, tmp_dir))
+
+
+def top_customers_external(transactions, n=5, max_keys=100_000, tmp_dir=None):
+    """
+    First n rows of customer_analysis as [(customer_id, data)], keeping
+    only an n-item heap over the merged groups (no full sort).
+    """
+    top = heapq.nsmallest(n, _customer_groups(transactions, max_keys, tmp_dir), key=_customer_rank)
+    return [(cid, data) for _, cid, data in top]
+
+
+def daily_sales_trend_external(transactions, max_keys=100_000, tmp_dir=None):
+    """
+    Out-of-core daily_sales_trend (same output). Groups come back from
+    the merge already in date order, so no final sort is needed.
+    """
+    # agg: [revenue_paise, transaction_count, customers]
+    def init():
+        return [0, 0, set()]
+
+    def update(agg, t):
+        agg[0] += _amount_paise(t)
+        agg[1] += 1
+        agg[2].add(t["customer_id"])
+
+    def merge(a, b):
+        return [a[0] + b[0], a[1] + b[1], a[2] | b[2]]
+
+    final = {}
+    for date, (paise, cnt, customers) in external_group_by(
+        transactions, lambda t: t["date"], init, update, merge,
+        max_keys=max_keys, tmp_dir=tmp_dir,
+    ):
+        final[date] = {
+            "revenue": _to_rupees(paise),
+            "transaction_count": cnt,
+            "unique_customers": len(customers),
+        }
+    return final
+
+
+def rfm_segmentation_external(transactions, reference_date=None, buckets=5, max_bins=10_000,
+                              max_keys=100_000, tmp_dir=None):
+    """
+    Out-of-core rfm_segmentation (same output). The per-customer stats
+    are grouped under max_keys, written to one run on disk and read back
+    twice (sketch pass, scoring pass); the final ranking is an
+    external_sort. Only the returned dict holds every customer.
+    """
+    # agg: [last_date, count, paise]
+    def init():
+        return ["", 0, 0]
+
+    def update(agg, t):
+        if t["date"] > agg[0]:
+            agg[0] = t["date"]
+        agg[1] += 1
+        agg[2] += _amount_paise(t)
+
+    def merge(a, b):
+        return [max(a[0], b[0]), a[1] + b[1], a[2] + b[2]]
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as run_dir:
+        latest = ""
+
+        def stats_rows():
+            nonlocal latest
+            for cid, (last, freq, spent) in external_group_by(
+                _dated(transactions), lambda t: t["customer_id"], init, update, merge,
+                max_keys=max_keys, tmp_dir=run_dir,
+            ):
+                if last > latest:
+                    latest = last
+                yield cid, last, freq, spent
+
+        run = _write_run(stats_rows(), run_dir)
+        if not latest:
+            return {}
+
+        ref = _rfm_reference(latest, reference_date)
+        scored = _rfm_scored(lambda: _read_run(run), ref, buckets, max_bins)
+        return dict(external_sort(scored, key=_rfm_rank, max_items=max_keys, tmp_dir=run_dir))
@@ -1,6 +1,15 @@
 from __future__ import annotations
+import sys
+from collections import deque
+from functools import lru_cache
+from decimal import Decimal, ROUND_HALF_UP
+from glob import glob, has_magic
 from pathlib import Path
-from typing import List, Tuple,Dict, Any
+from typing import List, Tuple
+
+from utils.anomaly_detector import AnomalyDetector, save_anomalies
+from utils.dedup import TransactionIdSet
+from utils.records import SalesRecord
 
 def read_sales_data(filename: str | Path) -> list[str]:
     """
@@ -47,13 +56,33 @@ def read_sales_data(filename: str | Path) -> list[str]:
 
 
 
-def _parse_line(line: str) -> Dict[str, Any] | None:
+@lru_cache(maxsize=4096)
+def _parse_paise(price_s: str) -> int:
+    """
+    Parses a cleaned price string ("1916", "173.5") straight into integer
+    paise, without going through float. Plain 0-2 decimal prices take the
+    fast integer path; anything else (more decimals, exponents) falls back
+    to Decimal with half-up rounding. Cached: repeated prices parse once
+    and share one int object across rows.
+    """
+    whole, _, frac = price_s.partition(".")
+    digits = whole[1:] if whole[:1] in "+-" else whole
+    if digits.isdigit() and len(frac) <= 2 and (not frac or frac.isdigit()):
+        paise = int(digits) * 100 + int(frac.ljust(2, "0"))
+        return -paise if whole.startswith("-") else paise
+    return int(Decimal(price_s).scaleb(2).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def parse_line(line: str) -> SalesRecord | None:
     """
     Expected pipe-delimited format:
     TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region
     Cleans:
     - commas in ProductName
     - commas in numeric fields (1,500 -> 1500)
+
+    Low-cardinality text fields (date, IDs, name, region) are interned, so
+    rows share one string object per distinct value.
     """
     parts = [p.strip() for p in line.strip().split("|")]
     if len(parts) != 8:
@@ -71,21 +100,22 @@ def _parse_line(line: str) -> Dict[str, Any] | None:
     # Convert types
     try:
         quantity = int(qty_s)
-        unit_price = float(price_s)
-    except ValueError:
+        unit_price_paise = _parse_paise(price_s)
+    except (ValueError, ArithmeticError):
         return None
 
-    # Return dictionary 
-    return {
-        "transaction_id": transaction_id,
-        "date": date_s,
-        "product_id": product_id,
-        "product_name": product_name,
-        "quantity": quantity,
-        "unit_price": unit_price,
-        "customer_id": customer_id,
-        "region": region,
-    }
+    # Return compact record (dict-style access)
+    intern = sys.intern
+    return SalesRecord(
+        transaction_id=transaction_id,
+        date=intern(date_s),
+        product_id=intern(product_id),
+        product_name=intern(product_name),
+        quantity=quantity,
+        unit_price_paise=unit_price_paise,
+        customer_id=intern(customer_id),
+        region=intern(region),
+    )
 
 
 
@@ -93,11 +123,23 @@ def load_sales_data(file_path: str | Path) -> Tuple[List[SalesRecord], int, int]
     """
     Loads and validates sales data from a text file.
 
+    file_path may also be a directory or a glob pattern
+    (e.g. data/hourly/*.txt); see load_sales_data_many. Repeated
+    TransactionIDs across files are then counted as removed.
+
     Returns: Q1
         valid_records,
         total_records_parsed,
         invalid_records_removed
     """
+    if is_multi_source(file_path):
+        valid, total_parsed, invalid, duplicates = load_sales_data_many(file_path)
+        return valid, total_parsed, invalid + duplicates
+
+    return _load_one(file_path)
+
+
+def _load_one(file_path: str | Path) -> Tuple[List[SalesRecord], int, int]:
     path = Path(file_path)
     if not path.exists():
         raise FileNotFoundError(f"Input file not found: {path}")
@@ -105,11 +147,11 @@ def load_sales_data(file_path: str | Path) -> Tuple[List[SalesRecord], int, int]
     lines = read_sales_data(path)
 
     total_parsed = len(lines)
-    valid: List[Dict[str, Any]] = []
+    valid: List[SalesRecord] = []
     invalid = 0
 
     for ln in lines:
-        rec = _parse_line(ln)
+        rec = parse_line(ln)
         if rec is None:
             invalid += 1
         else:
@@ -118,12 +160,142 @@ def load_sales_data(file_path: str | Path) -> Tuple[List[SalesRecord], int, int]
     return valid, total_parsed, invalid
 
 
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+def is_multi_source(source: str | Path) -> bool:
+    """
+    True for a directory or glob pattern. These are always deduplicated,
+    even while they match a single file, since more files can appear.
+    """
+    return has_magic(str(source)) or Path(source).is_dir()
+
+
+def list_sources(source: str | Path) -> List[Path]:
+    """Directory -> its *.txt files, glob -> matches, file -> itself (sorted)."""
+    if has_magic(str(source)):
+        return sorted(Path(p) for p in glob(str(source)) if Path(p).is_file())
+
+    path = Path(source)
+    if path.is_dir():
+        return sorted(p for p in path.glob("*.txt") if p.is_file())
+    return [path]
+
+
+def load_sales_data_many(
+    source: str | Path | List[str | Path],
+    max_workers: int = 4,
+    use_processes: bool = False,
+    max_ids_in_memory: int = 1_000_000,
+) -> Tuple[List[SalesRecord], int, int, int]:
+    """
+    Loads sales data from a directory, glob pattern or list of files.
+
+    Files are read and parsed in parallel (thread pool by default,
+    process pool with use_processes=True) and merged in file-name order
+    as they complete. At most 2 * max_workers parsed files are held at
+    once. The first valid occurrence of a TransactionID wins; later
+    re-sends are dropped (exact check, spills to disk past
+    max_ids_in_memory). Rows that fail is_valid_transaction are not
+    deduplicated: they are passed through for validate_and_filter to
+    count, so a broken first copy never shadows a good re-send.
+
+    Returns:
+        valid_records,
+        total_records_parsed,
+        invalid_records_removed,
+        duplicates_removed
+    """
+    if isinstance(source, (list, tuple)):
+        files = [Path(p) for p in source]
+    else:
+        files = list_sources(source)
+
+    if not files:
+        raise FileNotFoundError(f"No input files found: {source}")
+
+    valid: List[SalesRecord] = []
+    total_parsed = 0
+    invalid = 0
+    duplicates = 0
+
+    # Imported on demand: single-file runs never need the pools
+    if use_processes:
+        from concurrent.futures import ProcessPoolExecutor as pool_cls
+    else:
+        from concurrent.futures import ThreadPoolExecutor as pool_cls
+    with pool_cls(max_workers=max_workers) as pool, \
+            TransactionIdSet(max_in_memory=max_ids_in_memory) as seen:
+        pending = deque()
+        files_iter = iter(files)
+
+        # Prime a bounded window of in-flight files
+        for path in files_iter:
+            pending.append(pool.submit(_load_one, path))
+            if len(pending) >= 2 * max_workers:
+                break
+
+        while pending:
+            records, parsed, bad = pending.popleft().result()
+
+            next_path = next(files_iter, None)
+            if next_path is not None:
+                pending.append(pool.submit(_load_one, next_path))
+
+            total_parsed += parsed
+            invalid += bad
+            for rec in records:
+                if not is_valid_transaction(rec) or seen.add(rec["transaction_id"]):
+                    valid.append(rec)
+                else:
+                    duplicates += 1
+
+    return valid, total_parsed, invalid, duplicates
+
+
+def is_valid_transaction(t) -> bool:
+    """
+    Row-level validation rules of validate_and_filter: required fields,
+    T/P/C ID prefixes, and a positive quantity and unit price.
+    """
+    # Required fields
+    required_keys = ["transaction_id", "product_id", "customer_id", "region", "quantity", "unit_price"]
+    if any(k not in t or t[k] in (None, "") for k in required_keys):
+        return False
+
+    # ID format validation
+    if not str(t["transaction_id"]).startswith("T"):
+        return False
+    if not str(t["product_id"]).startswith("P"):
+        return False
+    if not str(t["customer_id"]).startswith("C"):
+        return False
+
+    # Quantity and UnitPrice validation
+    try:
+        qty = int(t["quantity"])
+        price = float(t["unit_price"])
+    except (ValueError, TypeError):
+        return False
+
+    return qty > 0 and price > 0
+
+
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None,
+                        anomaly_file=None, z_threshold=3.0, verbose=True, detector=None,
+                        detect_anomalies=True):
     """
     Validates transactions and applies optional filters.
 
+    Valid rows are also scored for outlier amounts in the same pass
+    (running stats per product and per region). Flagged rows are counted
+    in the summary and written to anomaly_file if given, in chunks as they
+    occur. Pass a shared AnomalyDetector as detector to keep running
+    stats across calls (e.g. appended batches); anomaly_file is then
+    appended to. detect_anomalies=False skips the scoring (e.g. a preview).
+    verbose=False suppresses the filter info printout.
+
     Returns: (valid_transactions, invalid_count, filter_summary)
     """
+    log = print if verbose else (lambda *args, **kwargs: None)
+
     total_input = len(transactions)
     invalid = 0
     valid = []
@@ -131,41 +303,40 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     # Collect region options + amount range from valid candidates
     regions_set = set()
     amounts = []
+    append_anomalies = detector is not None
+    if not detect_anomalies:
+        detector = None
+    elif detector is None:
+        detector = AnomalyDetector(z_threshold=z_threshold)
+
+    flagged = 0
+    pending = []  # flagged rows not yet written to anomaly_file
+
+    def flush_anomalies():
+        nonlocal append_anomalies
+        if anomaly_file is not None and (pending or not append_anomalies):
+            save_anomalies(pending, anomaly_file, append=append_anomalies)
+            append_anomalies = True
+        pending.clear()
 
     # --------- Validation ----------
     for t in transactions:
-        # Required fields
-        required_keys = ["transaction_id", "product_id", "customer_id", "region", "quantity", "unit_price"]
-        if any(k not in t or t[k] in (None, "") for k in required_keys):
-            invalid += 1
-            continue
-
-        # ID format validation
-        if not str(t["transaction_id"]).startswith("T"):
-            invalid += 1
-            continue
-        if not str(t["product_id"]).startswith("P"):
-            invalid += 1
-            continue
-        if not str(t["customer_id"]).startswith("C"):
-            invalid += 1
-            continue
-
-        # Quantity and UnitPrice validation
-        try:
-            qty = int(t["quantity"])
-            price = float(t["unit_price"])
-        except (ValueError, TypeError):
-            invalid += 1
-            continue
-
-        if qty <= 0 or price <= 0:
+        if not is_valid_transaction(t):
             invalid += 1
             continue
+        qty = int(t["quantity"])
+        price = float(t["unit_price"])
 
         # Compute amount
         amount = qty * price
         t["amount"] = amount  # store amount for filtering/reporting
+        if detector is not None:
+            flag = detector.check(t, amount)
+            if flag is not None:
+                flagged += 1
+                pending.append(flag)
+                if len(pending) >= 1000:
+                    flush_anomalies()
 
         valid.append(t)
         regions_set.add(t["region"])
@@ -173,13 +344,18 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
 
     # Print available options
     available_regions = sorted(regions_set)
-    print("\n=== Filter Info ===")
-    print(f"Available regions: {available_regions}")
+    log("\n=== Filter Info ===")
+    log(f"Available regions: {available_regions}")
 
     if amounts:
-        print(f"Transaction amount range: min={min(amounts):.2f}, max={max(amounts):.2f}")
+        log(f"Transaction amount range: min={min(amounts):.2f}, max={max(amounts):.2f}")
     else:
-        print("Transaction amount range: min=0.00, max=0.00")
+        log("Transaction amount range: min=0.00, max=0.00")
+
+    if detector is not None:
+        flush_anomalies()
+        if anomaly_file is not None:
+            log(f"Flagged anomalies: {flagged} (saved to {anomaly_file})")
 
     # --------- Filtering ----------
     filtered_by_region = 0
@@ -192,20 +368,20 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
         before = len(filtered)
         filtered = [t for t in filtered if t["region"] == region]
         filtered_by_region = before - len(filtered)
-        print(f"After region filter ({region}): {len(filtered)} records")
+        log(f"After region filter ({region}): {len(filtered)} records")
 
     # Amount filters
     if min_amount is not None:
         before = len(filtered)
         filtered = [t for t in filtered if t["amount"] >= float(min_amount)]
         filtered_by_amount += before - len(filtered)
-        print(f"After min_amount filter ({min_amount}): {len(filtered)} records")
+        log(f"After min_amount filter ({min_amount}): {len(filtered)} records")
 
     if max_amount is not None:
         before = len(filtered)
         filtered = [t for t in filtered if t["amount"] <= float(max_amount)]
         filtered_by_amount += before - len(filtered)
-        print(f"After max_amount filter ({max_amount}): {len(filtered)} records")
+        log(f"After max_amount filter ({max_amount}): {len(filtered)} records")
 
     summary = {
         "total_input": total_input,
@@ -213,6 +389,7 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
         "filtered_by_region": filtered_by_region,
         "filtered_by_amount": filtered_by_amount,
         "final_count": len(filtered),
+        "anomalies": flagged,
     }
 
     return filtered, invalid, summary
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class Stage:
+    """
+    One pipeline step: func(*inputs) -> outputs.
+
+    inputs/outputs are artifact names. func returns a single value when
+    there is one output, a tuple for several, and anything (ignored) for
+    none. executor is "thread", "process" (func and its inputs must be
+    picklable) or "main" (run inline on the scheduler thread).
+    """
+
+    def __init__(self, name: str, func: Callable[..., Any], inputs: Sequence[str] = (),
+                 outputs: Sequence[str] = (), executor: str = "thread"):
+        if executor not in ("thread", "process", "main"):
+            raise ValueError(f"unknown executor {executor!r} for stage {name}")
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.executor = executor
+
+
+class Pipeline:
+    """
+    Small DAG scheduler.
+
+    Stages declare the artifacts they consume and produce; a stage starts
+    as soon as all of its inputs exist, so independent stages (e.g. the
+    API fetch and the analysis) overlap. After run(), `timings` holds
+    (start, end) per stage and critical_path() names the chain of
+    dependent stages that bounded the total runtime.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.stages: Dict[str, Stage] = {}
+        self.timings: Dict[str, Tuple[float, float]] = {}
+        self._producer: Dict[str, str] = {}
+
+    def add(self, name: str, func: Callable[..., Any], inputs: Sequence[str] = (),
+            outputs: Sequence[str] = (), executor: str = "thread") -> None:
+        if name in self.stages:
+            raise ValueError(f"duplicate stage {name}")
+        stage = Stage(name, func, inputs, outputs, executor)
+        for out in stage.outputs:
+            if out in self._producer:
+                raise ValueError(f"artifact {out} produced by both {self._producer[out]} and {name}")
+            self._producer[out] = name
+        self.stages[name] = stage
+
+    def _check(self, available: Sequence[str]) -> None:
+        known = set(available) | set(self._producer)
+        for stage in self.stages.values():
+            missing = [i for i in stage.inputs if i not in known]
+            if missing:
+                raise ValueError(f"stage {stage.name} needs {missing}, which nothing produces")
+
+        # Cycle check (DFS over producer edges)
+        state: Dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            if state.get(name) == 1:
+                raise ValueError(f"cycle in pipeline at stage {name}")
+            if state.get(name) == 2:
+                return
+            state[name] = 1
+            for dep in self._deps(name):
+                visit(dep)
+            state[name] = 2
+
+        for name in self.stages:
+            visit(name)
+
+    def _deps(self, name: str) -> List[str]:
+        return [self._producer[i] for i in self.stages[name].inputs if i in self._producer]
+
+    def run(
+        self,
+        artifacts: Optional[Dict[str, Any]] = None,
+        on_complete: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Runs every stage once. artifacts seeds already-available values
+        (e.g. restored from checkpoints). on_complete(stage, outputs) is
+        called on the scheduler thread as each stage finishes.
+
+        Returns: all artifacts. The first stage error is re-raised after
+        in-flight stages finish; stages not yet started are skipped.
+        """
+        artifacts = dict(artifacts or {})
+        self._check(list(artifacts))
+        self.timings = {}
+
+        pending = dict(self.stages)
+        running: Dict[Any, Stage] = {}
+        starts: Dict[str, float] = {}
+        error: Optional[BaseException] = None
+
+        needs_processes = any(s.executor == "process" for s in pending.values())
+        threads = ThreadPoolExecutor(max_workers=self.max_workers)
+        processes = None
+        if needs_processes:
+            from concurrent.futures import ProcessPoolExecutor
+            processes = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        def finish(stage: Stage, result: Any) -> None:
+            self.timings[stage.name] = (starts[stage.name], time.perf_counter())
+            if len(stage.outputs) == 1:
+                result = (result,)
+            outputs = dict(zip(stage.outputs, result)) if stage.outputs else {}
+            artifacts.update(outputs)
+            if on_complete is not None:
+                on_complete(stage.name, outputs)
+
+        try:
+            while (pending or running) and error is None:
+                ready = [s for s in pending.values() if all(i in artifacts for i in s.inputs)]
+                for stage in ready:
+                    del pending[stage.name]
+                    args = [artifacts[i] for i in stage.inputs]
+                    starts[stage.name] = time.perf_counter()
+                    if stage.executor == "main":
+                        finish(stage, stage.func(*args))
+                        continue
+                    pool = processes if stage.executor == "process" else threads
+                    running[pool.submit(stage.func, *args)] = stage
+
+                if ready and any(s.executor == "main" for s in ready):
+                    continue  # inline stages may have unlocked more work
+
+                if not running:
+                    if pending:
+                        raise RuntimeError(f"pipeline stalled; cannot run {sorted(pending)}")
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    stage = running.pop(fut)
+                    try:
+                        result = fut.result()
+                    except BaseException as e:
+                        error = error or e
+                        continue
+                    finish(stage, result)
+
+            # let in-flight stages finish before surfacing an error
+            for fut, stage in running.items():
+                try:
+                    finish(stage, fut.result())
+                except BaseException:
+                    pass
+        finally:
+            threads.shutdown(wait=True)
+            if processes is not None:
+                processes.shutdown(wait=True)
+
+        if error is not None:
+            raise error
+        return artifacts
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """
+        Longest chain of dependent stages by measured duration.
+
+        Returns: (stage names in order, summed duration in seconds)
+        """
+        best: Dict[str, Tuple[float, List[str]]] = {}
+
+        def longest(name: str) -> Tuple[float, List[str]]:
+            if name not in best:
+                start, end = self.timings[name]
+                prev = max(
+                    (longest(d) for d in self._deps(name) if d in self.timings),
+                    key=lambda x: x[0],
+                    default=(0.0, []),
+                )
+                best[name] = (prev[0] + (end - start), prev[1] + [name])
+            return best[name]
+
+        if not self.timings:
+            return [], 0.0
+        total, path = max((longest(n) for n in self.timings), key=lambda x: x[0])
+        return path, total
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+BASE_URL = "https://dummyjson.com/products"
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter: `rate` requests per second on average,
+    bursts of up to `capacity`. acquire() blocks until a token is free.
+    """
+
+    def __init__(self, rate: float = 10.0, capacity: Optional[int] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Opens once the error rate over the last `window` calls reaches
+    `error_threshold` (after at least `min_calls`). While open, calls fail
+    fast; after `reset_timeout` seconds one trial call is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, error_threshold: float = 0.5, window: int = 20,
+                 min_calls: int = 5, reset_timeout: float = 30.0):
+        self.error_threshold = error_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._results: deque = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                if success:
+                    self.state = self.CLOSED
+                    self._results.clear()
+                else:
+                    self._open()
+                return
+
+            self._results.append(success)
+            if len(self._results) >= self.min_calls:
+                errors = self._results.count(False)
+                if errors / len(self._results) >= self.error_threshold:
+                    self._open()
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class ClientMetrics:
+    """Counters + request latency histogram (milliseconds)."""
+
+    BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {
+            "requests": 0,
+            "successes": 0,
+            "not_found": 0,
+            "failures": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "coalesced": 0,
+            "rejected_open_circuit": 0,
+        }
+        # last bucket is "> 5000ms"
+        self.latency_hist = [0] * (len(self.BUCKETS_MS) + 1)
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def observe_latency(self, seconds: float) -> None:
+        ms = seconds * 1000
+        with self._lock:
+            self.latency_hist[bisect_left(self.BUCKETS_MS, ms)] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"<={b}ms" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+            return {
+                **self.counters,
+                "latency_ms": dict(zip(labels, self.latency_hist)),
+            }
+
+
+class ProductClient:
+    """
+    Product lookups against the DummyJSON API (or any compatible base_url,
+    e.g. a local fake server).
+
+    - token-bucket rate limiting on outgoing requests
+    - circuit breaker: fails fast (returns None) while the API is erroring
+    - cache of answered lookups (including 404s)
+    - concurrent lookups of the same ID share one in-flight request
+    - metrics(): counters and latency histogram
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        timeout: float = 5.0,
+        rate: float = 10.0,
+        burst: Optional[int] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        session: Optional[Any] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.limiter = TokenBucket(rate, burst)
+        self.breaker = breaker or CircuitBreaker()
+        # requests is imported here, not at module level, so importing this
+        # module (e.g. for offline runs) never loads the network stack
+        import requests
+        self._request_error = requests.RequestException
+        self.session = session or requests.Session()
+        self._metrics = ClientMetrics()
+        self._cache: Dict[int, Optional[Dict[str, Any]]] = {}
+        self._in_flight: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_product(self, pid: int) -> Optional[Dict[str, Any]]:
+        """Returns the product dict, or None (not found / API unavailable)."""
+        with self._lock:
+            if pid in self._cache:
+                self._metrics.incr("cache_hits")
+                return self._cache[pid]
+
+            future = self._in_flight.get(pid)
+            if future is not None:
+                leader = False
+                self._metrics.incr("coalesced")
+            else:
+                leader = True
+                future = self._in_flight[pid] = Future()
+                self._metrics.incr("cache_misses")
+
+        if not leader:
+            return future.result()
+
+        product = None
+        try:
+            product, cacheable = self._fetch(pid)
+            if cacheable:
+                with self._lock:
+                    self._cache[pid] = product
+        finally:
+            with self._lock:
+                del self._in_flight[pid]
+            future.set_result(product)
+
+        return product
+
+    def _fetch(self, pid: int):
+        """One product lookup. Returns (product_or_None, cacheable)."""
+        status, product = self._request(f"{self.base_url}/{pid}")
+        if status == 200:
+            return product, True
+        # 404 is a valid answer (cached); anything else may be retried
+        return None, status == 404
+
+    def _request(self, url: str):
+        """
+        One rate-limited, breaker-guarded GET with metrics.
+
+        Returns: (200, json body), (404, None), or (None, None) when the
+        call failed or the circuit was open.
+        """
+        if not self.breaker.allow():
+            self._metrics.incr("rejected_open_circuit")
+            return None, None
+
+        self.limiter.acquire()
+        self._metrics.incr("requests")
+        start = time.perf_counter()
+        try:
+            r = self.session.get(url, timeout=self.timeout)
+        except self._request_error:
+            self._metrics.observe_latency(time.perf_counter() - start)
+            self._metrics.incr("failures")
+            self.breaker.record(False)
+            return None, None
+        self._metrics.observe_latency(time.perf_counter() - start)
+
+        if r.status_code == 200:
+            try:
+                body = r.json()
+            except ValueError:
+                self._metrics.incr("failures")
+                self.breaker.record(False)
+                return None, None
+            self._metrics.incr("successes")
+            self.breaker.record(True)
+            return 200, body
+        if r.status_code == 404:
+            # A valid answer, not an API failure
+            self._metrics.incr("not_found")
+            self.breaker.record(True)
+            return 404, None
+
+        self._metrics.incr("failures")
+        self.breaker.record(False)
+        return None, None
+
+    def list_products(self, limit: int = 100, skip: int = 0) -> Optional[List[Dict[str, Any]]]:
+        """
+        One page of the product list endpoint (?limit=&skip=), with the same
+        rate limit, breaker and metrics as get_product. The returned
+        products also fill the per-ID cache.
+
+        Returns: list of products, or None if the call failed.
+        """
+        status, body = self._request(f"{self.base_url}?limit={limit}&skip={skip}")
+        if status != 200:
+            return None
+        products = body.get("products", [])
+        with self._lock:
+            for p in products:
+                if "id" in p:
+                    self._cache.setdefault(p["id"], p)
+        return products
+
+    def get_products(self, ids: Iterable[int], max_workers: int = 8) -> List[Dict[str, Any]]:
+        """Looks up many IDs concurrently; returns the found products in ID order."""
+        ids = list(ids)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(self.get_product, ids))
+        return [p for p in results if p is not None]
+
+    def metrics(self) -> Dict[str, Any]:
+        snap = self._metrics.snapshot()
+        snap["circuit_state"] = self.breaker.state
+        return snap
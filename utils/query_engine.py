@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import sqlite3
+from itertools import islice
+from typing import Any, Dict, Iterable, List
+
+from utils.data_processor import _amount_paise, _to_rupees
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sales (
+    transaction_id   TEXT,
+    date             TEXT,
+    product_id       TEXT,
+    product_name     TEXT,
+    quantity         INTEGER,
+    unit_price_paise INTEGER,
+    amount_paise     INTEGER,
+    customer_id      TEXT,
+    region           TEXT
+)
+"""
+
+_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_sales_region ON sales(region)",
+    "CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(date)",
+    "CREATE INDEX IF NOT EXISTS idx_sales_product ON sales(product_id)",
+    "CREATE INDEX IF NOT EXISTS idx_sales_customer ON sales(customer_id)",
+]
+
+
+def _row(t) -> tuple:
+    paise = t.get("unit_price_paise")
+    if paise is None:
+        paise = round(t["unit_price"] * 100)
+    return (
+        t["transaction_id"],
+        t.get("date"),
+        t["product_id"],
+        t.get("product_name"),
+        t["quantity"],
+        paise,
+        _amount_paise(t),
+        t["customer_id"],
+        t["region"],
+    )
+
+
+def load_transactions(
+    transactions: Iterable[Any],
+    db_path: str = ":memory:",
+    batch_size: int = 50_000,
+) -> sqlite3.Connection:
+    """
+    Bulk-loads parsed/validated transactions into an embedded SQLite db.
+
+    Rows go in with executemany in batches inside one transaction; the
+    indexes (region, date, product, customer) are built after the load,
+    which is much faster than maintaining them row by row.
+    Money is stored as integer paise, same as data_processor.
+
+    Returns: open sqlite3.Connection (in-memory by default)
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(_SCHEMA)
+
+    rows = map(_row, transactions)
+    with conn:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            conn.executemany("INSERT INTO sales VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+
+        for stmt in _INDEXES:
+            conn.execute(stmt)
+    conn.execute("ANALYZE")
+
+    return conn
+
+
+def run_query(conn: sqlite3.Connection, sql: str, params: Any = ()) -> List[Dict[str, Any]]:
+    """
+    Runs an ad-hoc query, e.g.
+        run_query(conn, "SELECT region, SUM(amount_paise) / 100.0 AS revenue "
+                        "FROM sales WHERE date >= ? GROUP BY region", ("2024-12-15",))
+
+    Returns: list of dicts (column name -> value)
+    """
+    cur = conn.execute(sql, params)
+    columns = [c[0] for c in cur.description]
+    return [dict(zip(columns, r)) for r in cur.fetchall()]
+
+
+# ---------------- Canned queries (same output as data_processor) ----------------
+# Ties are broken by first appearance (MIN(rowid)), matching the stable
+# Python sorts in data_processor.
+
+def sql_total_revenue(conn):
+    (paise,) = conn.execute("SELECT COALESCE(SUM(amount_paise), 0) FROM sales").fetchone()
+    return _to_rupees(paise)
+
+
+def sql_revenue_per_product(conn):
+    rows = conn.execute(
+        "SELECT product_id, SUM(amount_paise) FROM sales GROUP BY product_id ORDER BY MIN(rowid)"
+    )
+    return {pid: _to_rupees(paise) for pid, paise in rows}
+
+
+def sql_region_wise_sales(conn):
+    rows = conn.execute(
+        """
+        SELECT region, SUM(amount_paise) AS total, COUNT(*) AS cnt
+        FROM sales
+        GROUP BY region
+        ORDER BY total DESC, MIN(rowid)
+        """
+    ).fetchall()
+
+    overall = sum(r[1] for r in rows)
+    result = {}
+    for region, total, cnt in rows:
+        percentage = (total / overall) * 100 if overall > 0 else 0
+        result[region] = {
+            "total_sales": _to_rupees(total),
+            "transaction_count": cnt,
+            "percentage": round(percentage, 2),
+        }
+    return result
+
+
+def sql_top_selling_products(conn, n=5):
+    rows = conn.execute(
+        """
+        SELECT product_name, SUM(quantity) AS qty, SUM(amount_paise)
+        FROM sales
+        GROUP BY product_name
+        ORDER BY qty DESC, MIN(rowid)
+        LIMIT ?
+        """,
+        (n,),
+    )
+    return [(name, qty, _to_rupees(paise)) for name, qty, paise in rows]
+
+
+def sql_low_performing_products(conn, threshold=10):
+    rows = conn.execute(
+        """
+        SELECT product_name, SUM(quantity) AS qty, SUM(amount_paise)
+        FROM sales
+        GROUP BY product_name
+        HAVING qty < ?
+        ORDER BY qty, MIN(rowid)
+        """,
+        (threshold,),
+    )
+    return [(name, qty, _to_rupees(paise)) for name, qty, paise in rows]
+
+
+def sql_customer_analysis(conn):
+    # Product names have commas stripped at parse time, so ',' is a safe separator
+    rows = conn.execute(
+        """
+        SELECT customer_id, SUM(amount_paise) AS total, COUNT(*),
+               GROUP_CONCAT(DISTINCT product_name), MAX(date)
+        FROM sales
+        GROUP BY customer_id
+        ORDER BY total DESC, MIN(rowid)
+        """
+    )
+    result = {}
+    for cid, paise, cnt, products, last in rows:
+        result[cid] = {
+            "total_spent": _to_rupees(paise),
+            "purchase_count": cnt,
+            "products_bought": products.split(",") if products else [],
+            "last_purchase_date": last or "",
+            "avg_order_value": round(_to_rupees(paise) / cnt, 2),
+        }
+    return result
+
+
+def sql_daily_sales_trend(conn):
+    rows = conn.execute(
+        """
+        SELECT date, SUM(amount_paise), COUNT(*), COUNT(DISTINCT customer_id)
+        FROM sales
+        GROUP BY date
+        ORDER BY date
+        """
+    )
+    return {
+        date: {
+            "revenue": _to_rupees(paise),
+            "transaction_count": cnt,
+            "unique_customers": customers,
+        }
+        for date, paise, cnt, customers in rows
+    }
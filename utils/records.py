@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, Optional
+
+
+class SalesRecord:
+    """
+    One parsed sales transaction.
+
+    Uses __slots__ instead of a per-row dict but keeps dict-style access -
+    t["quantity"], t.get("date"), "amount" in t, dict(t) - so the
+    data_processor and report functions work on records and plain dicts
+    alike. The slot container is about a quarter of a dict's size; end to
+    end the saving is smaller, since the per-row strings dominate (the
+    parser interns the repeated ones). unit_price is not stored: it reads
+    as unit_price_paise / 100.
+
+    amount is None until validate_and_filter sets it; a None field reads
+    as missing ("amount" in t is False). Money sums use
+    data_processor._amount_paise (quantity * unit_price_paise).
+    """
+
+    __slots__ = (
+        "transaction_id",
+        "date",
+        "product_id",
+        "product_name",
+        "quantity",
+        "unit_price_paise",
+        "customer_id",
+        "region",
+        "amount",
+    )
+
+    # dict-style keys, in file order (unit_price is derived)
+    FIELDS = (
+        "transaction_id",
+        "date",
+        "product_id",
+        "product_name",
+        "quantity",
+        "unit_price",
+        "unit_price_paise",
+        "customer_id",
+        "region",
+        "amount",
+    )
+
+    def __init__(
+        self,
+        transaction_id: str,
+        date: str,
+        product_id: str,
+        product_name: str,
+        quantity: int,
+        unit_price_paise: int,
+        customer_id: str,
+        region: str,
+        amount: Optional[float] = None,
+    ):
+        self.transaction_id = transaction_id
+        self.date = date
+        self.product_id = product_id
+        self.product_name = product_name
+        self.quantity = quantity
+        self.unit_price_paise = unit_price_paise
+        self.customer_id = customer_id
+        self.region = region
+        self.amount = amount
+
+    @property
+    def unit_price(self) -> float:
+        return self.unit_price_paise / 100
+
+    @unit_price.setter
+    def unit_price(self, value: float) -> None:
+        self.unit_price_paise = round(value * 100)
+
+    # ---- dict-style access (backward compatibility) ----
+    def __getitem__(self, key: str) -> Any:
+        if key in _SALES_FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in _SALES_FIELDS:
+            raise KeyError(f"SalesRecord has no field {key!r}")
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in _SALES_FIELDS and getattr(self, key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _SALES_FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        return default
+
+    def keys(self) -> Iterator[str]:
+        return (k for k in self.FIELDS if getattr(self, k) is not None)
+
+    def items(self) -> Iterator[tuple]:
+        return ((k, getattr(self, k)) for k in self.keys())
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.keys())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (SalesRecord, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SalesRecord({self.to_dict()!r})"
+
+
+_SALES_FIELDS = frozenset(SalesRecord.FIELDS)
+
+API_FIELDS = ("API_Category", "API_Brand", "API_Rating", "API_Match")
+
+
+class EnrichedRecord:
+    """
+    A SalesRecord plus its API enrichment.
+
+    Instead of copying every row into a new dict with four extra keys, the
+    enrichment lives in a side-table: one small dict per product (API_*
+    keys), shared by every row of that product. The row object itself only
+    holds two references. Read-only dict-style access, same as SalesRecord.
+    """
+
+    __slots__ = ("record", "api")
+
+    def __init__(self, record: Any, api: Dict[str, Any]):
+        self.record = record
+        self.api = api
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.api:
+            return self.api[key]
+        return self.record[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.api or key in self.record
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.api:
+            return self.api[key]
+        return self.record.get(key, default)
+
+    def keys(self) -> Iterator[str]:
+        yield from self.record.keys()
+        yield from self.api.keys()
+
+    def items(self) -> Iterator[tuple]:
+        return ((k, self[k]) for k in self.keys())
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def __len__(self) -> int:
+        return len(self.record) + len(self.api)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"EnrichedRecord({self.to_dict()!r})"
@@ -7,10 +7,11 @@ from utils.data_processor import (
     calculate_total_revenue,
     region_wise_sales,
     top_selling_products,
-    customer_analysis,
+    top_customers,
     daily_sales_trend,
     find_peak_sales_day,
     low_performing_products,
+    rfm_segment_summary,
 )
 
 
@@ -26,43 +27,55 @@ def generate_sales_report(
     transactions: List[Dict[str, Any]],
     enriched_transactions: List[Dict[str, Any]],
     output_file: str = r"output\sales_report.txt",
+    max_keys: int | None = None,
+    analysis: Dict[str, Any] | None = None,
 ) -> None:
     """
     Generates a comprehensive formatted text report (8 sections, in order).
+
+    analysis: precomputed metrics (keys total_revenue, region_stats,
+    top_products, top_customers, daily_trend, peak_day, low_products, as
+    built by main._run_analysis); computed here when not given.
+    max_keys: memory budget for the per-customer and per-date aggregations
+    (see data_processor.customer_analysis); None keeps them in memory.
     """
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     records_processed = len(transactions)
 
+    if analysis is None:
+        daily_trend = daily_sales_trend(transactions, max_keys=max_keys)
+        analysis = {
+            "total_revenue": calculate_total_revenue(transactions),
+            "region_stats": region_wise_sales(transactions),
+            "top_products": top_selling_products(transactions, n=5),
+            "top_customers": top_customers(transactions, n=5, max_keys=max_keys),
+            "daily_trend": daily_trend,
+            "peak_day": find_peak_sales_day(transactions, trend=daily_trend),
+            "low_products": low_performing_products(transactions, threshold=10),
+        }
+
     # Overall metrics
-    total_revenue = calculate_total_revenue(transactions)
+    total_revenue = analysis["total_revenue"]
     total_tx = len(transactions)
     avg_order_value = (total_revenue / total_tx) if total_tx else 0.0
 
-    dates = sorted({t.get("date", "") for t in transactions if t.get("date")})
-    date_range = f"{dates[0]} to {dates[-1]}" if dates else "N/A"
-
     # Region stats
-    reg_stats = region_wise_sales(transactions)
+    reg_stats = analysis["region_stats"]
 
     # Top products
-    top_products = top_selling_products(transactions, n=5)
+    top_products = analysis["top_products"]
 
-    # Top customers (convert customer_analysis dict to ranked list)
-    cust_stats = customer_analysis(transactions)
-    top_customers = []
-    rank = 1
-    for cid, info in cust_stats.items():
-        top_customers.append((rank, cid, info["total_spent"], info["purchase_count"]))
-        rank += 1
-        if rank > 5:
-            break
+    # Top customers: (rank, customer_id, total_spent, purchase_count)
+    top_cust = analysis["top_customers"]
 
-    # Daily trend
-    daily = daily_sales_trend(transactions)
+    # Daily trend (chronological, so it also gives the date range)
+    daily = analysis["daily_trend"]
+    dates = [d for d in daily if d]
+    date_range = f"{dates[0]} to {dates[-1]}" if dates else "N/A"
 
     # Product performance
-    peak_date, peak_revenue, peak_count = find_peak_sales_day(transactions)
-    low_products = low_performing_products(transactions, threshold=10)
+    peak_date, peak_revenue, peak_count = analysis["peak_day"]
+    low_products = analysis["low_products"]
 
     # Avg transaction value per region
     avg_tx_value_region = {}
@@ -129,7 +142,7 @@ def generate_sales_report(
     lines.append("TOP 5 CUSTOMERS")
     lines.append(_line("-"))
     lines.append(f"{'Rank':<6}{'Customer':<12}{'Total Spent':>15}{'Orders':>8}")
-    for r, cid, spent, cnt in top_customers:
+    for r, cid, spent, cnt in top_cust:
         lines.append(f"{r:<6}{cid:<12}{_fmt_money(spent):>15}{cnt:>8}")
     lines.append("")
 
@@ -178,3 +191,83 @@ def generate_sales_report(
 
     with open(output_file, "w", encoding="utf-8") as f:
         f.write("\n".join(lines))
+
+
+def generate_rfm_report(
+    rfm: Dict[str, Dict[str, Any]],
+    output_file: str = r"output\rfm_segments.txt",
+) -> None:
+    """
+    Writes the RFM segmentation (segment summary + one row per customer).
+    Pipe-delimited customer rows so marketing can load it directly.
+    """
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    summary = rfm_segment_summary(rfm)
+
+    lines: List[str] = []
+    lines.append(_line("="))
+    lines.append("       RFM CUSTOMER SEGMENTATION")
+    lines.append(f"     Generated: {now}")
+    lines.append(f"     Customers: {len(rfm)}")
+    lines.append(_line("="))
+    lines.append("")
+
+    lines.append("SEGMENT SUMMARY")
+    lines.append(_line("-"))
+    lines.append(f"{'Segment':<22}{'Customers':>10}{'Revenue':>15}")
+    for seg, info in summary.items():
+        lines.append(f"{seg:<22}{info['customers']:>10}{_fmt_money(info['revenue']):>15}")
+    lines.append("")
+
+    lines.append("CUSTOMERS")
+    lines.append(_line("-"))
+    lines.append("CustomerID|LastPurchase|RecencyDays|Frequency|Monetary|R|F|M|RFM|Segment")
+    for cid, info in rfm.items():
+        lines.append(
+            "|".join([
+                cid,
+                info["last_purchase_date"],
+                str(info["recency_days"]),
+                str(info["frequency"]),
+                f"{info['monetary']:.2f}",
+                str(info["r_score"]),
+                str(info["f_score"]),
+                str(info["m_score"]),
+                info["rfm"],
+                info["segment"],
+            ])
+        )
+    lines.append("")
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def generate_basket_report(
+    rules: List[Dict[str, Any]],
+    output_file: str = r"output\product_affinity.txt",
+    top_n: int = 20,
+) -> None:
+    """
+    Writes the strongest co-purchase rules (utils/basket_analysis.py),
+    pipe-delimited so marketing can load them directly.
+    """
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    lines: List[str] = []
+    lines.append(_line("="))
+    lines.append("       PRODUCT AFFINITY (BOUGHT TOGETHER)")
+    lines.append(f"     Generated: {now}")
+    lines.append(f"     Rules: {len(rules)} (top {min(top_n, len(rules))} shown)")
+    lines.append(_line("="))
+    lines.append("")
+    lines.append("If|Then|Support|Confidence|Lift|Customers")
+    for r in rules[:top_n]:
+        lines.append(
+            f"{r['antecedent']}|{r['consequent']}|{r['support']:.4f}|"
+            f"{r['confidence']:.4f}|{r['lift']:.4f}|{r['count']}"
+        )
+    lines.append("")
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))